@@ -0,0 +1,314 @@
+"""性能基准脚本，在临时目录的独立数据库上运行，不影响 xiuxian.db
+
+用法: python benchmark.py [基准名 ...]，不带参数时运行全部基准
+python benchmark.py check 只检查热点查询的执行计划，发现未登记的扫描时退出码非零
+"""
+import gc
+import io
+import json
+import os
+import random
+import re
+import sys
+import threading
+import tempfile
+import time
+import tracemalloc
+
+
+# 启动时的工作目录，渲染基准从这里找字体文件
+_START_DIR = os.getcwd()
+
+
+def _use_temp_database():
+    """切换到临时目录，之后创建的 Database() 都使用其中的新数据库"""
+    os.chdir(tempfile.mkdtemp(prefix="xiuxian_bench_"))
+
+
+def _create_players(count: int, prefix: str = "bench"):
+    """批量创建带物品、技能和任务的玩家，返回 qq_id 列表"""
+    from database import Database
+    from player import Player
+
+    db = Database()
+    qq_ids = [f"{prefix}{i}" for i in range(count)]
+    with db.transaction():
+        for qq_id in qq_ids:
+            player = Player(qq_id, f"道友{qq_id}")
+            for n in range(10):
+                player.add_item(f"材料{n}", n + 1)
+            player.add_skill_exp('炼丹术', 150)
+    return qq_ids
+
+
+def _timed(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def bench_hydrate(players: int = 500, rounds: int = 5):
+    """对比逐个集合加载（五次查询）和 json_group_object 单次查询的玩家完整加载"""
+    from player import Player
+
+    qq_ids = _create_players(players, "hydrate")
+
+    def per_collection():
+        for qq_id in qq_ids:
+            player = Player(qq_id)
+            for name in Player.COLLECTIONS:
+                getattr(player, name)
+
+    def single_query():
+        for qq_id in qq_ids:
+            Player(qq_id, hydrate=True)
+
+    for label, func in (("五次查询", per_collection), ("单次查询", single_query)):
+        best = min(_timed(func) for _ in range(rounds))
+        print(f"{label}: {best / players * 1e6:.1f} 微秒/玩家")
+
+
+class _DictPlayer:
+    """改造前的玩家表示：实例 __dict__ 加嵌套字典，用于内存对比"""
+
+    def __init__(self, fields, row):
+        for name, value in zip(fields, row[:-4]):
+            setattr(self, name, value)
+        roots, skills, items, quests = (json.loads(c) for c in row[-4:])
+        self.roots = roots
+        self.skills = {k: {'level': v[0], 'exp': v[1]} for k, v in skills.items()}
+        self.items = {k: {'count': v[0], 'durability': v[1]} for k, v in items.items()}
+        self.quests = {k: {'name': v[0], 'type': v[1], 'progress': json.loads(v[2]) if v[2] else {},
+                           'is_completed': bool(v[3])} for k, v in quests.items()}
+
+
+def _retained_bytes(build) -> int:
+    """构建对象并返回其常驻内存（对象保留到测量结束）"""
+    gc.collect()
+    tracemalloc.start()
+    objects = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return size
+
+
+def bench_memory(sizes=(10_000, 100_000), templates: int = 200):
+    """对比字典表示和 __slots__ 表示下缓存 N 个完整玩家的内存占用"""
+    from database import Database
+    from player import Player
+
+    db = Database()
+    qq_ids = _create_players(templates, "memory")
+    rows = [db.fetch_one(Player.HYDRATE_QUERY, (qq_id,)) for qq_id in qq_ids]
+    fields = [c[1] for c in db.fetch_all("PRAGMA table_info(players)")]
+
+    for size in sizes:
+        picks = [i % templates for i in range(size)]
+        legacy = _retained_bytes(lambda: [_DictPlayer(fields, rows[i]) for i in picks])
+        slotted = _retained_bytes(lambda: [Player(qq_ids[i], hydrate=True) for i in picks])
+        print(f"{size} 个玩家: 字典表示 {legacy / size:.0f} 字节/玩家, "
+              f"slots表示 {slotted / size:.0f} 字节/玩家 ({slotted / legacy:.0%})")
+
+
+def bench_transfer(players: int = 10, threads: int = 8, transfers: int = 300):
+    """并发赠送压力检查：每个线程持有各自过期的玩家对象随机互相赠送，
+    结束后每种道具的总数必须不变且没有负数，并且确实有赠送被数据库的条件扣减拒绝"""
+    from database import Database
+    from player import ItemRecord, Player
+
+    db = Database()
+    qq_ids = _create_players(players, "transfer")
+    totals_query = "SELECT item_id, SUM(count) FROM items GROUP BY item_id ORDER BY item_id"
+    before = db.fetch_all(totals_query)
+    outcomes = {'成功': 0, '预检拒绝': 0, '条件扣减拒绝': 0}
+    outcome_lock = threading.Lock()
+
+    def worker(seed: int):
+        rng = random.Random(seed)
+        # 每个线程一开始加载自己的玩家对象，之后不再刷新，模拟过期的内存状态
+        local = {qq_id: Player(qq_id) for qq_id in qq_ids}
+        for _ in range(transfers):
+            source, target = rng.sample(qq_ids, 2)
+            items = {f"材料{n}": rng.randint(1, 3) for n in rng.sample(range(10), 3)}
+            # 让过期的内存数量总是显得充足，越过内存预检，由 count >= ? 条件扣减和其他线程竞争
+            # （只改内存记录，不经过物品日志，不会写入数据库）
+            view = local[source].items
+            for item_name, count in items.items():
+                if view.get(item_name) is None or view[item_name].count < count:
+                    view[item_name] = ItemRecord(count)
+            with db.transaction():
+                result = local[source].transfer_items(items, local[target])
+            # 条件扣减失败时 transfer_items 会按数据库重新加载物品，据此区分两种拒绝
+            outcome = '成功' if not result else '条件扣减拒绝' if local[source].items is not view else '预检拒绝'
+            with outcome_lock:
+                outcomes[outcome] += 1
+
+    workers = [threading.Thread(target=worker, args=(seed,)) for seed in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    after = db.fetch_all(totals_query)
+    negative = db.fetch_one("SELECT COUNT(*) FROM items WHERE count < 0")[0]
+    print(f"{threads} 线程共 {threads * transfers} 次赠送，用时 {elapsed:.2f} 秒，"
+          f"成功 {outcomes['成功']} 次，条件扣减拒绝 {outcomes['条件扣减拒绝']} 次，"
+          f"内存预检拒绝 {outcomes['预检拒绝']} 次")
+    assert before == after, f"道具总数发生变化: {before} -> {after}"
+    assert negative == 0, f"出现 {negative} 条负数记录"
+    assert outcomes['条件扣减拒绝'] > 0, "没有赠送走到条件扣减，压力检查没有覆盖并发竞争"
+    print("道具总数守恒，没有负数记录")
+
+
+def bench_message(repeat: int = 20000):
+    """对比原先在CQ码文本上逐条正则查找、逐字符清理昵称，与只切出指令文本的解析加昵称缓存"""
+    from commands import parse_raw, sanitize_nickname
+
+    codes = "".join(f"[CQ:face,id={i}][CQ:image,file=img{i}.jpg,url=http://example.com/{i}]" for i in range(10))
+    long_raw = f"赠送道具 灵草 3 {codes}[CQ:at,qq=123456789] 这是一段很长的附加说明文字" * 3
+    short_raw = "赠送道具 灵草 3 [CQ:at,qq=123456789]"
+    nickname = "　修仙者★一号 "
+
+    def regex_path(raw):
+        text = raw.strip()
+        nick = "".join(c for c in nickname if c.isprintable() and not c.isspace())[:20]
+        match = re.search(r"赠送道具\s+(\S+)\s*(\d*)\s*\[CQ:at,qq=(\d+)\]", text)
+        target = re.search(r"\[CQ:at,qq=(\d+)\]", text)
+        return nick, match, target
+
+    def parser_path(raw):
+        return sanitize_nickname(nickname), parse_raw(raw)
+
+    for raw in (long_raw, short_raw):
+        print(f"消息长度 {len(raw)} 字符，{raw.count('[CQ:')} 个CQ码")
+        for label, func in (("正则", regex_path), ("指令文本解析", parser_path)):
+            best = min(_timed(lambda: [func(raw) for _ in range(repeat)]) for _ in range(5))
+            print(f"  {label}: {best / repeat * 1e6:.2f} 微秒/条")
+
+
+def bench_render(seconds: float = 2.0):
+    """帮助图片和排行榜图片每秒渲染次数：每次清空字体和行位图缓存（相当于原先每次加载字体）
+    与缓存常驻对比，以及按字节预算编码与原先RGB PNG的体积和耗时"""
+    import render
+    from ranking import RankingSystem
+
+    font = render.LAYOUTS['help']['font']
+    if not os.path.exists(font):
+        source = os.path.join(_START_DIR, font)
+        if not os.path.exists(source):
+            print(f"找不到字体文件 {font}，跳过")
+            return
+        os.symlink(source, font)
+
+    # 与修仙指南篇幅相近的帮助文本
+    help_text = "\n\n".join(
+        f"【系统{n}】\n" + "\n".join(f"指令{n}-{i} [参数] - 说明文字，功能介绍和注意事项" for i in range(5))
+        for n in range(10))
+    ranking = [{'name': f"道友{i}", 'faction': "正道", 'power': 1000 - i} for i in range(10)]
+    cases = (("帮助", help_text, 'help'),
+             ("排行榜", RankingSystem().format_ranking(ranking), 'ranking'))
+    for label, text, layout in cases:
+        modes = (("无缓存", True, render.render_text), ("缓存", False, render.render_text),
+                 ("缓存+编码", False, render.render_encoded))
+        for mode, cold, func in modes:
+            done, start = 0, time.perf_counter()
+            while time.perf_counter() - start < seconds:
+                if cold:
+                    render.clear_caches()
+                func(text, layout)
+                done += 1
+            print(f"{label} {mode}: {done / (time.perf_counter() - start):.1f} 张/秒")
+        img = render.render_text(text, layout)
+        baseline = _timed(img.convert('RGB').save, io.BytesIO(), 'PNG')
+        baseline_size = len(render._save(img.convert('RGB'), 'PNG'))
+        data, image_format, encode_time = render.encode_image(img, render.LAYOUTS[layout])
+        print(f"{label} 编码: RGB PNG {baseline_size / 1024:.1f}KB {baseline * 1000:.1f}ms -> "
+              f"{image_format} {len(data) / 1024:.1f}KB {encode_time * 1000:.1f}ms")
+
+
+def bench_leaderboard(players: int = 100_000, ops: int = 20000):
+    """内存排行榜：重建耗时，以及 top/rank_of/around/战力更新每次的耗时，对照数据库分页查询"""
+    from database import Database
+    from ranking import Leaderboard
+
+    db = Database()
+    rng = random.Random(1)
+    with db.transaction():
+        db.executemany(
+            "INSERT INTO players (qq_id, name, faction, realm, stage, power) VALUES (?, ?, '中立', '炼体境', '初期', ?)",
+            [(f"rank{i}", f"道友{i}", rng.random() * 8000) for i in range(players)])
+    qq_ids = [f"rank{i}" for i in range(players)]
+
+    board = Leaderboard()
+    print(f"{players} 个玩家重建: {_timed(board.load, db) * 1000:.0f} 毫秒")
+    cases = (
+        ("数据库分页(第500页)", lambda: db.fetch_all(db.HOT_QUERIES['ranking_page'], (10, 5000))),
+        ("top(10, 5000)", lambda: board.top(10, 5000)),
+        ("rank_of", lambda: board.rank_of(rng.choice(qq_ids))),
+        ("around(2)", lambda: board.around(rng.choice(qq_ids), 2)),
+        ("战力更新", lambda: board.update(rng.choice(qq_ids), rng.random() * 8000, "道友", "中立")),
+    )
+    for label, func in cases:
+        elapsed = _timed(lambda: [func() for _ in range(ops)])
+        print(f"  {label}: {elapsed / ops * 1e6:.1f} 微秒/次")
+
+
+def check_transfer_flags():
+    """赠送给原来没有该道具的玩家时，配方标记和耐久随道具一起转移"""
+    from database import Database
+    from player import Player
+
+    db = Database()
+    giver, receiver = _create_players(2, "flags")
+    with db.transaction():
+        source = Player(giver)
+        source.add_item("回春丹配方", 2, is_recipe=True, recipe_type='alchemy')
+        source.add_item("青锋剑", 1, durability=80)
+    with db.transaction():
+        result = Player(giver).transfer_items({"回春丹配方": 1, "青锋剑": 1}, Player(receiver))
+    assert result is None, f"赠送失败: {result}"
+
+    query = "SELECT count, durability, is_recipe, recipe_type FROM items WHERE qq_id = ? AND item_id = ?"
+    recipe = db.fetch_one(query, (receiver, "回春丹配方"))
+    sword = db.fetch_one(query, (receiver, "青锋剑"))
+    assert tuple(recipe) == (1, None, 1, 'alchemy'), f"配方标记丢失: {tuple(recipe)}"
+    assert tuple(sword) == (1, 80, 0, None), f"耐久丢失: {tuple(sword)}"
+    assert db.fetch_one(db.HOT_QUERIES['item_recipe_flag'], ("回春丹配方", receiver))[0]
+    assert db.fetch_one(query, (giver, "青锋剑")) is None, "赠送方的道具没有扣除"
+    print("  配方标记和耐久随赠送转移")
+
+
+def check_query_plans():
+    """检查登记的热点查询都按索引查找，有未登记的扫描时以非零状态退出"""
+    from database import Database
+
+    db = Database()
+    scans = db.full_scan_queries()
+    for name, plan in scans.items():
+        print(f"  {name} 发生扫描: {plan}")
+    if scans:
+        sys.exit(1)
+    print(f"  {len(db.HOT_QUERIES)} 条热点查询都按索引查找（允许的扫描 {len(db.EXPECTED_SCANS)} 条）")
+
+
+BENCHMARKS = {
+    'hydrate': bench_hydrate,
+    'memory': bench_memory,
+    'transfer': bench_transfer,
+    'message': bench_message,
+    'render': bench_render,
+    'leaderboard': bench_leaderboard,
+    'check': check_query_plans,
+    'transfer_flags': check_transfer_flags,
+}
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    _use_temp_database()
+    for name in sys.argv[1:] or BENCHMARKS:
+        print(f"== {name} ==")
+        BENCHMARKS[name]()
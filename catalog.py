@@ -0,0 +1,175 @@
+import json
+import threading
+from typing import NamedTuple, Dict, Optional
+from database import Database
+
+
+class AlchemyRecipe(NamedTuple):
+    recipe_id: str
+    name: str
+    grade: str
+    sub_grade: Optional[str]
+    required_level: int
+    ingredients: Dict[str, int]
+    effect: str
+    is_breakthrough: bool
+
+
+class ForgingRecipe(NamedTuple):
+    recipe_id: str
+    name: str
+    type: str
+    grade: str
+    sub_grade: Optional[str]
+    required_level: int
+    materials: Dict[str, int]
+    attributes: Dict[str, int]
+
+
+class TalismanRecipe(NamedTuple):
+    recipe_id: str
+    name: str
+    grade: str
+    effect_type: str
+    required_level: int
+    materials: Dict[str, int]
+    effect: str
+
+
+class Monster(NamedTuple):
+    monster_id: str
+    name: str
+    level: str
+    health: int
+    attack: int
+    defense: int
+    drop_items: Dict[str, float]
+    realm_requirement: str
+
+
+class Plant(NamedTuple):
+    plant_id: str
+    name: str
+    growth_stages: int
+    required_environment: str
+    yield_items: Dict[str, int]
+    variant_chance: float
+
+
+class MaterialSource(NamedTuple):
+    material_id: str
+    name: str
+    source_type: str
+    source_level: str
+    drop_rate: float
+
+
+class Quest(NamedTuple):
+    quest_id: str
+    name: str
+    type: str
+    level: str
+    required_realm: str
+    required_faction: str
+    objectives: dict
+    rewards: dict
+    reward_type: str
+    is_repeatable: bool
+
+
+class GameCatalog:
+    """静态游戏数据的内存目录，启动时加载一次，JSON字段预先解析
+
+    配方、妖兽、灵植、材料和任务都是静态数据，各系统共享同一个目录，
+    数据库被外部修改（data_version变化）时自动重新加载。
+    """
+
+    # 记录类型: (表名, 需要解析的JSON字段)
+    TABLES = {
+        AlchemyRecipe: ('alchemy_recipes', ('ingredients',)),
+        ForgingRecipe: ('forging_recipes', ('materials', 'attributes')),
+        TalismanRecipe: ('talisman_recipes', ('materials',)),
+        Monster: ('monsters', ('drop_items',)),
+        Plant: ('plants', ('yield_items',)),
+        MaterialSource: ('material_sources', ()),
+        Quest: ('quests', ('objectives', 'rewards')),
+    }
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, db: Database = None):
+        self.db = db or Database()
+        self.data_version = None
+        self.load()
+
+    @classmethod
+    def shared(cls) -> "GameCatalog":
+        """获取进程内共享的目录实例"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def _load_table(self, record_type, table: str, json_fields) -> dict:
+        columns = record_type._fields
+        rows = self.db.fetch_all(f"SELECT {', '.join(columns)} FROM {table}")
+        records = {}
+        for row in rows:
+            values = dict(zip(columns, row))
+            for field in json_fields:
+                values[field] = json.loads(values[field]) if values[field] else {}
+            records[row[0]] = record_type(**values)
+        return records
+
+    def load(self):
+        """从数据库加载全部静态数据并建立按ID和名称的索引"""
+        self.data_version = self.db.data_version()
+        tables = {record_type: self._load_table(record_type, table, json_fields)
+                  for record_type, (table, json_fields) in self.TABLES.items()}
+
+        # 按ID索引
+        self.alchemy_recipes = tables[AlchemyRecipe]
+        self.forging_recipes = tables[ForgingRecipe]
+        self.talisman_recipes = tables[TalismanRecipe]
+        self.monsters = tables[Monster]
+        self.plants = tables[Plant]
+        self.materials = tables[MaterialSource]
+        self.quests = tables[Quest]
+
+        # 按名称索引（名称重复时保留先出现的记录，与原先 fetch_one 的行为一致）
+        self.alchemy_by_name = self._index_by_name(self.alchemy_recipes)
+        self.forging_by_name = self._index_by_name(self.forging_recipes)
+        self.talisman_by_name = self._index_by_name(self.talisman_recipes)
+        self.monsters_by_name = self._index_by_name(self.monsters)
+        self.plants_by_name = self._index_by_name(self.plants)
+        self.quests_by_name = self._index_by_name(self.quests)
+
+    @staticmethod
+    def _index_by_name(records: dict) -> dict:
+        by_name = {}
+        for record in records.values():
+            by_name.setdefault(record.name, record)
+        return by_name
+
+    def refresh(self) -> bool:
+        """数据库被其他连接修改过时重新加载，返回是否发生了重新加载"""
+        if self.db.data_version() == self.data_version:
+            return False
+        self.load()
+        return True
+
+    def recipes(self, recipe_type: str) -> dict:
+        """按配方类型（alchemy/forging/talisman）获取配方表"""
+        return {
+            'alchemy': self.alchemy_recipes,
+            'forging': self.forging_recipes,
+            'talisman': self.talisman_recipes,
+        }[recipe_type]
+
+    def recipes_by_name(self, recipe_type: str) -> dict:
+        return {
+            'alchemy': self.alchemy_by_name,
+            'forging': self.forging_by_name,
+            'talisman': self.talisman_by_name,
+        }[recipe_type]
@@ -0,0 +1,292 @@
+import re
+import time
+from collections import Counter
+from functools import lru_cache
+from catalog import GameCatalog
+from executors import run_in
+from player import PlayerCache, load_stats
+
+# 消息开头可能出现的空白字符
+_LEADING_WHITESPACE = (" ", "\t", "\r", "\n", "　")
+
+# at码（不含@全体成员），捕获其中的QQ
+_AT_CODE = re.compile(r"\[CQ:at,(?:[^\]]*?,)?qq=(\d+)")
+
+# 消息开头连续的CQ码（回复、@机器人等）及其间的空白
+_LEADING_CODES = re.compile(r"(?:\s*\[CQ:[^\]]*\])*")
+
+# CQ码文本中的转义字符
+_CQ_ESCAPES = (("&#91;", "["), ("&#93;", "]"), ("&#44;", ","), ("&amp;", "&"))
+
+
+class ParsedMessage:
+    """一条群消息解析后的结构：指令文本，以及按顺序被@的QQ
+
+    指令文本是消息中第一段连续的文字（跳过开头的CQ码，到下一个CQ码或表情、图片等消息段为止），
+    指令和参数都写在这一段里；之后夹在CQ码之间的文字不参与指令解析。
+    """
+    __slots__ = ('text', 'mentions')
+
+    def __init__(self, text: str, mentions: list):
+        self.text = text
+        self.mentions = mentions
+
+
+def parse_segments(segments) -> ParsedMessage:
+    """从 OneBot 消息段数组解析：取第一段连续的文本段作为指令文本，at段收集为被@的QQ"""
+    # seen_text: 已收集的文本段里有非空白字符，逐段判断，不必每遇到一个非文本段就重新拼接
+    text_parts, mentions, seen_text, closed = [], [], False, False
+    for segment in segments:
+        kind, data = segment.get('type'), segment.get('data') or {}
+        if kind == 'text':
+            if not closed:
+                part = data.get('text', '')
+                text_parts.append(part)
+                seen_text = seen_text or (part and not part.isspace())
+            continue
+        if kind == 'at':
+            qq = str(data.get('qq', ''))
+            if qq.isdigit():
+                mentions.append(qq)
+        # 已经有文字之后遇到其他消息段，指令文本到此结束
+        if seen_text:
+            closed = True
+    return ParsedMessage("".join(text_parts).strip(), mentions)
+
+
+def parse_raw(raw: str) -> ParsedMessage:
+    """没有消息段时从CQ码文本解析，效果与 parse_segments 相同
+
+    只切出指令所在的那一段文字，不对整条消息做替换和拼接；被@的QQ用一次 findall 取出。
+    附带大量表情、图片CQ码的长消息，开销也只和这一段文字的长度及一次扫描有关。
+    """
+    start = _LEADING_CODES.match(raw).end()
+    end = raw.find("[CQ:", start)
+    text = raw[start:] if end < 0 else raw[start:end]
+    if "&" in text:
+        for escaped, char in _CQ_ESCAPES:
+            text = text.replace(escaped, char)
+    mentions = _AT_CODE.findall(raw) if "[CQ:at," in raw else []
+    return ParsedMessage(text.strip(), mentions)
+
+
+def parse_message(msg) -> ParsedMessage:
+    """把群消息解析一次，供路由和所有指令共用；优先使用结构化的消息段"""
+    segments = getattr(msg, 'message', None)
+    if isinstance(segments, list) and segments:
+        return parse_segments(segments)
+    return parse_raw(msg.raw_message)
+
+
+@lru_cache(maxsize=4096)
+def sanitize_nickname(nickname: str) -> str:
+    """清理昵称中的非法字符并限制长度，同一昵称只计算一次"""
+    return "".join(c for c in nickname if c.isprintable() and not c.isspace())[:20]
+
+
+class CommandCall:
+    """一条解析好的指令调用：指令、参数和被@的QQ"""
+    __slots__ = ('command', 'args', 'mentions', 'text')
+
+    def __init__(self, command, args: tuple, mentions: list, text: str):
+        self.command = command
+        self.args = args
+        self.mentions = mentions
+        self.text = text
+
+    @property
+    def target_id(self):
+        """指令作用的对方：第一个被@的QQ"""
+        return self.mentions[0] if self.mentions else None
+
+    def lock_keys(self, user_qq: str) -> tuple:
+        """执行期间需要锁住的玩家：发送者，以及战斗、赠送等指令的对方"""
+        if self.command.needs_target:
+            return (user_qq, self.target_id)
+        return (user_qq,)
+
+
+class CommandContext:
+    """一次指令执行的上下文，由路由器按指令声明准备好玩家和目标玩家"""
+    __slots__ = ('call', 'user_qq', 'qq_nickname', 'player', 'target')
+
+    def __init__(self, call: CommandCall, user_qq: str, qq_nickname: str):
+        self.call = call
+        self.user_qq = user_qq
+        self.qq_nickname = qq_nickname
+        self.player = None
+        self.target = None
+
+    @property
+    def args(self) -> tuple:
+        return self.call.args
+
+
+class Command:
+    """一条指令：关键字、预编译的参数解析、处理函数和执行统计
+
+    pattern 匹配关键字之后的纯文本，捕获组依次作为参数；没有 pattern 时参数是去掉空白的剩余文本。
+    needs_target 的指令以第一个被@的玩家为对方，路由器会同时加载（和锁住）对方。
+    writes 为 False 的只读指令不开写事务，处理函数（包括它调用的各系统方法）不能写数据库；
+    加载玩家时创建新玩家、同步昵称的写入各自原子提交，不受此限制。
+    runs_on 声明处理函数在哪里执行：db（默认，数据库线程）、io（线程池）、cpu（进程池）
+    或 loop（直接在事件循环中执行，只用于不阻塞的查表类处理函数）；
+    后三种不访问数据库，以 handler(*args) 调用，cpu 指令的处理函数和返回值必须可以序列化。
+    """
+
+    def __init__(self, keyword: str, handler, pattern: str = None, usage: str = None,
+                 exact: bool = False, needs_player: bool = True, needs_target: bool = False,
+                 writes: bool = True, hydrate: bool = False, runs_on: str = 'db'):
+        if runs_on not in ('db', 'io', 'cpu', 'loop'):
+            raise ValueError(f"指令 {keyword} 的 runs_on 无效: {runs_on}")
+        if runs_on != 'db' and (needs_player or needs_target or writes):
+            raise ValueError(f"指令 {keyword} 需要访问数据库，只能在数据库线程执行")
+        self.keyword = keyword
+        self.handler = handler
+        self.pattern = re.compile(pattern) if pattern else None
+        self.usage = usage
+        self.exact = exact
+        self.needs_player = needs_player
+        self.needs_target = needs_target
+        self.writes = writes
+        self.hydrate = hydrate
+        self.runs_on = runs_on
+
+        # 执行统计
+        self.calls = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.loads = Counter()
+
+    def parse(self, rest: str):
+        """解析参数，格式不对时返回None"""
+        if self.exact:
+            return () if not rest.strip() else None
+        if self.pattern is None:
+            return (rest.strip(),)
+        match = self.pattern.match(rest)
+        return match.groups() if match else None
+
+    def record(self, elapsed: float, loads: Counter):
+        self.calls += 1
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+        self.loads.update(loads)
+
+
+class CommandRouter:
+    """表驱动的指令路由：关键字前缀树，按最长关键字匹配，匹配开销只与关键字长度有关
+
+    新指令通过 register/command 注册，不需要修改分发逻辑。
+    """
+
+    def __init__(self):
+        # 前缀树节点: {字符: 子节点}，键 None 存放在此结束的指令
+        self._trie = {}
+        self.commands = {}
+        self.prefixes = ()
+
+    def register(self, keyword: str, handler, **options) -> Command:
+        command = Command(keyword, handler, **options)
+        node = self._trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[None] = command
+        self.commands[keyword] = command
+        self.prefixes = tuple(self.commands)
+        return command
+
+    def command(self, keyword: str, **options):
+        """装饰器形式的注册"""
+        def decorator(handler):
+            self.register(keyword, handler, **options)
+            return handler
+        return decorator
+
+    def is_command(self, raw: str) -> bool:
+        """指令预筛：群里绝大多数消息是闲聊，在任何数据库操作之前排除
+
+        只用 str.startswith 在原字符串上比较，不切片、不去空白，不分配新对象；
+        只有以空白开头的消息（很少见）才去掉空白后再判断一次。
+        """
+        if raw.startswith(self.prefixes):
+            return True
+        return raw.startswith(_LEADING_WHITESPACE) and raw.lstrip().startswith(self.prefixes)
+
+    def resolve(self, message: ParsedMessage):
+        """把解析后的消息匹配为指令调用；不是指令时返回None，格式不对时 args 为None"""
+        command, rest = self.match(message.text)
+        if command is None:
+            return None
+        args = command.parse(rest)
+        if command.needs_target and not message.mentions:
+            args = None
+        return CommandCall(command, args, message.mentions, message.text)
+
+    def match(self, text: str):
+        """按最长关键字匹配指令，返回 (指令, 关键字之后的文本)，没有匹配时指令为None"""
+        node = self._trie
+        found, end = None, 0
+        for i, char in enumerate(text):
+            node = node.get(char)
+            if node is None:
+                break
+            if None in node:
+                found, end = node[None], i + 1
+        return found, text[end:]
+
+    def execute(self, call: CommandCall, user_qq: str, qq_nickname: str):
+        """在数据库线程中执行指令，返回要发送的消息参数（None表示不回复）"""
+        command = call.command
+        start = time.perf_counter()
+        load_stats.take()
+        try:
+            # 数据库被外部修改过时重新加载静态数据
+            GameCatalog.shared().refresh()
+
+            ctx = CommandContext(call, user_qq, qq_nickname)
+            cache = PlayerCache.shared()
+            if command.needs_player:
+                ctx.player = cache.get(user_qq, qq_nickname, command.hydrate)
+            if command.needs_target:
+                ctx.target = cache.get(call.target_id, hydrate=command.hydrate)
+
+            result = command.handler(ctx)
+        finally:
+            command.record(time.perf_counter() - start, load_stats.take())
+        return self._reply(result, user_qq)
+
+    async def execute_offloaded(self, call: CommandCall, user_qq: str):
+        """把不访问数据库的指令投递到声明的 io/cpu 池执行，loop 指令直接调用"""
+        command = call.command
+        start = time.perf_counter()
+        try:
+            if command.runs_on == 'loop':
+                result = command.handler(*call.args)
+            else:
+                result = await run_in(command.runs_on, command.handler, *call.args)
+        finally:
+            command.record(time.perf_counter() - start, Counter())
+        return self._reply(result, user_qq)
+
+    @staticmethod
+    def _reply(result, user_qq: str):
+        """文本结果@发送者回复，字典原样作为消息参数"""
+        if isinstance(result, str):
+            return {'at': user_qq, 'text': result + "\n"} if result else None
+        return result
+
+    def stats(self) -> list:
+        """各指令的执行统计，按总耗时从高到低排列"""
+        rows = [{
+            'command': command.keyword,
+            'calls': command.calls,
+            'avg_ms': command.total_time / command.calls * 1000 if command.calls else 0.0,
+            'max_ms': command.max_time * 1000,
+            'loads': dict(command.loads),
+        } for command in self.commands.values()]
+        return sorted(rows, key=lambda row: row['avg_ms'] * row['calls'], reverse=True)
+
+
+# 进程内共享的指令表
+router = CommandRouter()
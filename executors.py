@@ -0,0 +1,94 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+
+def _timed_call(func, args):
+    """在工作线程/进程中执行，返回 (开始执行时间, 结果)，用于计算排队等待时间"""
+    return time.time(), func(*args)
+
+
+class BoundedExecutor:
+    """有界执行器：同时排队和执行的任务数有上限，超出时调用方在事件循环上等待
+
+    记录队列深度和等待时间，供 metrics() 汇总。
+    """
+
+    def __init__(self, name: str, executor, max_pending: int):
+        self.name = name
+        self.executor = executor
+        self.max_pending = max_pending
+        self._slots = None
+
+        # 统计
+        self.pending = 0      # 已提交、尚未完成（等待名额、排队中和执行中）
+        self.max_depth = 0
+        self.completed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    async def submit(self, func, *args):
+        """在池中执行 func(*args) 并等待结果"""
+        if self._slots is None:
+            # 信号量要在事件循环里创建
+            self._slots = asyncio.Semaphore(self.max_pending)
+        loop = asyncio.get_running_loop()
+        # 等待名额的时间也算排队时间
+        self.pending += 1
+        self.max_depth = max(self.max_depth, self.pending)
+        submitted_at = time.time()
+        try:
+            async with self._slots:
+                started_at, result = await loop.run_in_executor(
+                    self.executor, _timed_call, func, args)
+        finally:
+            self.pending -= 1
+        wait = max(0.0, started_at - submitted_at)
+        self.completed += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        return result
+
+    def metrics(self) -> dict:
+        return {
+            'executor': self.name,
+            'queue_depth': self.pending,
+            'max_depth': self.max_depth,
+            'completed': self.completed,
+            'avg_wait_ms': self.total_wait / self.completed * 1000 if self.completed else 0.0,
+            'max_wait_ms': self.max_wait * 1000,
+        }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+_cpu_workers = max(1, min(4, (os.cpu_count() or 2) - 1))
+
+# io：阻塞在文件/网络上的处理函数和图片落盘（数据库读写由 AsyncDatabase 的专用线程负责，不用这个池）；
+# cpu：图片渲染等纯计算，放到独立进程避免占用GIL
+# cpu 池用 spawn 启动进程：主进程已有数据库线程，fork 会复制持有中的锁
+EXECUTORS = {
+    'io': BoundedExecutor('io', ThreadPoolExecutor(max_workers=2, thread_name_prefix='io'),
+                          max_pending=16),
+    'cpu': BoundedExecutor('cpu', ProcessPoolExecutor(
+        max_workers=_cpu_workers, mp_context=multiprocessing.get_context('spawn')),
+        max_pending=_cpu_workers * 4),
+}
+
+
+async def run_in(kind: str, func, *args):
+    """按处理函数声明的类型（io/cpu）投递到对应的池"""
+    return await EXECUTORS[kind].submit(func, *args)
+
+
+def metrics() -> list:
+    """各执行器的队列深度和等待时间"""
+    return [executor.metrics() for executor in EXECUTORS.values()]
+
+
+def shutdown():
+    for executor in EXECUTORS.values():
+        executor.shutdown()
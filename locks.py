@@ -0,0 +1,65 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+
+class _KeyedLock:
+    __slots__ = ('lock', 'users')
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        # 持有或正在等待这把锁的协程数，为0时从注册表中移除
+        self.users = 0
+
+
+class KeyedLocks:
+    """按key（玩家qq_id）分配的asyncio锁
+
+    同一玩家的指令按到达顺序依次执行，不同玩家的指令互不阻塞。
+    需要同时锁住多个玩家时（战斗、赠送）按key排序后依次加锁，避免互相等待造成死锁。
+    没有协程使用的锁会立即清理，空闲玩家不占用内存。
+    """
+
+    def __init__(self):
+        self._locks = {}
+
+    @asynccontextmanager
+    async def hold(self, *keys):
+        """锁住给定的全部key，重复的key只锁一次"""
+        acquired = []
+        try:
+            for key in sorted(set(keys)):
+                await self._acquire(key)
+                acquired.append(key)
+            yield
+        finally:
+            for key in reversed(acquired):
+                self._release(key)
+
+    async def _acquire(self, key):
+        entry = self._locks.get(key)
+        if entry is None:
+            entry = self._locks[key] = _KeyedLock()
+        entry.users += 1
+        try:
+            await entry.lock.acquire()
+        except BaseException:
+            # 等待期间被取消
+            self._unref(key, entry)
+            raise
+
+    def _release(self, key):
+        entry = self._locks[key]
+        entry.lock.release()
+        self._unref(key, entry)
+
+    def _unref(self, key, entry: _KeyedLock):
+        entry.users -= 1
+        if entry.users == 0:
+            del self._locks[key]
+
+    def locked(self, key) -> bool:
+        entry = self._locks.get(key)
+        return entry is not None and entry.lock.locked()
+
+    def __len__(self):
+        return len(self._locks)
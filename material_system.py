@@ -1,33 +1,28 @@
-from database import Database
-import random
-
-class MaterialSystem:
-    def __init__(self):
-        self.db = Database()
-        
-    def get_monster_drops(self, monster_level: str) -> dict:
-        """获取妖兽掉落材料"""
-        materials = self.db.fetch_all(
-            "SELECT material_id, name FROM material_sources WHERE source_type = 'monster' AND source_level = ?",
-            (monster_level,)
-        )
-        return {m[0]: m[1] for m in materials} if materials else {}
-        
-    def random_drop(self, monster_level: str) -> str:
-        """随机掉落材料"""
-        drop_info = self.db.fetch_one(
-            "SELECT material_id, drop_rate FROM material_sources WHERE source_type = 'monster' AND source_level = ?",
-            (monster_level,)
-        )
-        
-        if drop_info and random.random() < drop_info[1]:
-            return drop_info[0]
-        return None
-        
-    def get_quest_rewards(self, quest_level: str) -> dict:
-        """获取任务奖励材料"""
-        materials = self.db.fetch_all(
-            "SELECT material_id, name FROM material_sources WHERE source_type = 'quest' AND source_level = ?",
-            (quest_level,)
-        )
-        return {m[0]: m[1] for m in materials} if materials else {}
\ No newline at end of file
+from database import Database
+from catalog import GameCatalog
+import random
+
+class MaterialSystem:
+    def __init__(self):
+        self.db = Database()
+        self.catalog = GameCatalog.shared()
+
+    def _sources(self, source_type: str, source_level: str) -> list:
+        return [m for m in self.catalog.materials.values()
+                if m.source_type == source_type and m.source_level == source_level]
+        
+    def get_monster_drops(self, monster_level: str) -> dict:
+        """获取妖兽掉落材料"""
+        return {m.material_id: m.name for m in self._sources('monster', monster_level)}
+        
+    def random_drop(self, monster_level: str) -> str:
+        """随机掉落材料"""
+        sources = self._sources('monster', monster_level)
+        
+        if sources and random.random() < sources[0].drop_rate:
+            return sources[0].material_id
+        return None
+        
+    def get_quest_rewards(self, quest_level: str) -> dict:
+        """获取任务奖励材料"""
+        return {m.material_id: m.name for m in self._sources('quest', quest_level)}
\ No newline at end of file
@@ -1,429 +1,744 @@
-from datetime import datetime, timedelta
-from database import Database
-import json
-import random
-
-class Player:
-    REALMS = {
-        '仙域': [
-            '炼体境', '练气境', '筑基境', '金丹境', 
-            '元婴境', '化神境', '渡劫境', '大乘境'
-        ],
-        '魔渊': [
-            '蚀骨境', '聚煞境', '铸魔台', '结魔丹',
-            '化魔胎', '炼狱境', '逆天境', '灭世境'
-        ],
-        '中立': [
-            '炼体境', '练气境', '筑基境', '金丹境',
-            '元婴境', '化神境', '渡劫境', '大乘境'
-        ]
-    }
-    
-    STAGES = ['初期', '中期', '后期', '大圆满']
-    
-    def __init__(self, qq_id: str, qq_nickname: str):
-        self.db = Database()
-        self.qq_id = qq_id
-        self.load_data(qq_nickname)
-
-    def load_data(self, current_nickname: str):
-        """加载玩家数据，总是使用最新QQ昵称"""
-        player_data = self.db.fetch_one(
-            "SELECT * FROM players WHERE qq_id = ?", 
-            (self.qq_id,)
-        )
-
-        if not player_data:
-            self.initialize_new_player(current_nickname)
-        else:
-            # 更新为最新QQ昵称
-            self.name = current_nickname
-            self.qq_nickname = player_data[2]  # 获取 qq_nickname 字段
-            self.faction = player_data[3]
-            self.realm = player_data[4]
-            self.stage = player_data[5]
-            self.cultivation = player_data[6]
-            self.health = player_data[7]
-            self.max_health = player_data[8]
-            self.mana = player_data[9]
-            self.max_mana = player_data[10]
-            self.attack = player_data[11]
-            self.defense = player_data[12]
-            self.speed = player_data[13]
-            self.gold = player_data[14]
-            self.create_time = player_data[15]
-            self.last_active = player_data[16]
-            self.last_cultivate = player_data[17] if player_data[17] else ""
-            self.last_battle = player_data[18] if player_data[18] else ""
-            self.is_cultivating = bool(player_data[19]) if player_data[19] is not None else False
-            self.cultivate_start_time = player_data[20] if player_data[20] else None
-            self.daily_cultivate_count = player_data[21] if player_data[21] is not None else 0
-            self.last_breakthrough_attempt = player_data[22] if player_data[22] else None
-
-            # 更新数据库中的名字
-            self.db.execute(
-                "UPDATE players SET name = ?, qq_nickname = ? WHERE qq_id = ?",
-                (current_nickname, current_nickname, self.qq_id)
-            )
-
-        # 加载其他数据
-        self.roots = self.load_spiritual_roots()
-        self.skills = self.load_skills()
-        self.items = self.load_items()
-        self.quests = self.load_quests()
-        
-    def initialize_new_player(self, qq_nickname: str):
-        """初始化新玩家，使用QQ昵称"""
-        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.name = qq_nickname  # 直接使用QQ昵称
-        self.faction = "中立"
-        self.realm = "炼体境"
-        self.stage = "初期"
-        self.cultivation = 0
-        self.health = 100
-        self.max_health = 100
-        self.mana = 100
-        self.max_mana = 100
-        self.attack = 10
-        self.defense = 5
-        self.speed = 5
-        self.gold = 100
-        self.create_time = now
-        self.last_active = now
-        self.last_cultivate = None
-        self.last_battle = None
-        self.is_cultivating = False
-        self.cultivate_start_time = None
-        self.daily_cultivate_count = 0
-        self.last_breakthrough_attempt = None
-        
-        # 随机生成灵根
-        root_types = ['金', '木', '水', '火', '土']
-        main_root = random.choice(root_types)
-        purity = random.randint(60, 90)
-        
-        self.db.execute(
-            """INSERT INTO players 
-            (qq_id, name, faction, realm, stage, cultivation, health, max_health, 
-             mana, max_mana, attack, defense, speed, gold, create_time, last_active,
-             is_cultivating, cultivate_start_time, daily_cultivate_count, last_breakthrough_attempt)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-            (self.qq_id, self.name, self.faction, self.realm, self.stage, 
-             self.cultivation, self.health, self.max_health, self.mana, 
-             self.max_mana, self.attack, self.defense, self.speed, 
-             self.gold, self.create_time, self.last_active,
-             self.is_cultivating, self.cultivate_start_time, self.daily_cultivate_count,
-             self.last_breakthrough_attempt)
-        )
-        
-        # 添加灵根
-        self.db.execute(
-            "INSERT INTO spiritual_roots (qq_id, root_type, purity) VALUES (?, ?, ?)",
-            (self.qq_id, main_root, purity)
-        )
-        
-        # 添加初始技能
-        initial_skills = ['基础吐纳', '基础剑法']
-        for skill in initial_skills:
-            self.db.execute(
-                "INSERT INTO skills (qq_id, skill_id, level) VALUES (?, ?, 1)",
-                (self.qq_id, skill)
-            )
-        
-        # 添加初始物品
-        initial_items = {'灵草': 5, '符纸': 10, '朱砂': 5}
-        for item, count in initial_items.items():
-            self.db.execute(
-                "INSERT INTO items (qq_id, item_id, count) VALUES (?, ?, ?)",
-                (self.qq_id, item, count)
-            )
-        
-        # 接受初始任务
-        self.db.execute(
-            "INSERT INTO player_quests (qq_id, quest_id) VALUES (?, 'main_1')",
-            (self.qq_id,)
-        )
-        
-        self.roots = {main_root: purity}
-        self.skills = {skill: {'level': 1, 'exp': 0} for skill in initial_skills}
-        self.items = initial_items
-        self.quests = {'main_1': {'progress': {}, 'is_completed': False}}
-        
-    def load_spiritual_roots(self):
-        roots_data = self.db.fetch_all(
-            "SELECT root_type, purity FROM spiritual_roots WHERE qq_id = ?", (self.qq_id,)
-        )
-        return {root[0]: root[1] for root in roots_data} if roots_data else {}
-        
-    def load_skills(self):
-        skills_data = self.db.fetch_all(
-            "SELECT skill_id, level, exp FROM skills WHERE qq_id = ?", (self.qq_id,)
-        )
-        return {skill[0]: {'level': skill[1], 'exp': skill[2]} for skill in skills_data} if skills_data else {}
-        
-    def load_items(self):
-        items_data = self.db.fetch_all(
-            "SELECT item_id, count, durability FROM items WHERE qq_id = ?", (self.qq_id,)
-        )
-        return {item[0]: {'count': item[1], 'durability': item[2]} for item in items_data} if items_data else {}
-        
-    def load_quests(self):
-        quests_data = self.db.fetch_all(
-            """SELECT q.quest_id, q.name, q.type, pq.progress, pq.is_completed 
-            FROM player_quests pq JOIN quests q ON pq.quest_id = q.quest_id 
-            WHERE pq.qq_id = ?""", (self.qq_id,)
-        )
-        return {quest[0]: {
-            'name': quest[1],
-            'type': quest[2],
-            'progress': json.loads(quest[3]) if quest[3] else {},
-            'is_completed': bool(quest[4])
-        } for quest in quests_data} if quests_data else {}
-        
-    def update(self):
-        self.db.execute(
-            """UPDATE players 
-            SET name=?, faction=?, realm=?, stage=?, cultivation=?, 
-                health=?, max_health=?, mana=?, max_mana=?, 
-                attack=?, defense=?, speed=?, gold=?, last_active=?,
-                is_cultivating=?, cultivate_start_time=?, daily_cultivate_count=?,
-                last_breakthrough_attempt=?
-            WHERE qq_id=?""",
-            (self.name, self.faction, self.realm, self.stage, self.cultivation,
-             self.health, self.max_health, self.mana, self.max_mana,
-             self.attack, self.defense, self.speed, self.gold,
-             datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-             self.is_cultivating, self.cultivate_start_time, self.daily_cultivate_count,
-             self.last_breakthrough_attempt,
-             self.qq_id)
-        )
-        
-    def start_cultivation(self):
-        """开始修炼"""
-        self.is_cultivating = True
-        self.cultivate_start_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        # 更新每日修炼次数
-        today = datetime.now().strftime("%Y-%m-%d")
-        if self.last_cultivate and self.last_cultivate.startswith(today):
-            self.daily_cultivate_count += 1
-        else:
-            self.daily_cultivate_count = 1
-            
-        self.last_cultivate = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.update()
-        
-    def complete_cultivation(self):
-        """完成修炼"""
-        self.is_cultivating = False
-        self.cultivate_start_time = None
-        self.update()
-        
-    def add_item(self, item_id: str, count: int = 1, durability: int = None):
-        if item_id in self.items:
-            self.db.execute(
-                "UPDATE items SET count = count + ? WHERE qq_id = ? AND item_id = ?",
-                (count, self.qq_id, item_id)
-            )
-            self.items[item_id]['count'] += count
-        else:
-            self.db.execute(
-                "INSERT INTO items (qq_id, item_id, count, durability) VALUES (?, ?, ?, ?)",
-                (self.qq_id, item_id, count, durability)
-            )
-            self.items[item_id] = {'count': count, 'durability': durability}
-            
-    def remove_item(self, item_id: str, count: int = 1) -> bool:
-        if item_id not in self.items or self.items[item_id]['count'] < count:
-            return False
-            
-        if self.items[item_id]['count'] == count:
-            self.db.execute(
-                "DELETE FROM items WHERE qq_id = ? AND item_id = ?",
-                (self.qq_id, item_id)
-            )
-            del self.items[item_id]
-        else:
-            self.db.execute(
-                "UPDATE items SET count = count - ? WHERE qq_id = ? AND item_id = ?",
-                (count, self.qq_id, item_id)
-            )
-            self.items[item_id]['count'] -= count
-            
-        return True
-        
-    def add_skill_exp(self, skill_id: str, exp: int):
-        if skill_id not in self.skills:
-            self.db.execute(
-                "INSERT INTO skills (qq_id, skill_id, level, exp) VALUES (?, ?, 1, ?)",
-                (self.qq_id, skill_id, exp)
-            )
-            self.skills[skill_id] = {'level': 1, 'exp': exp}
-        else:
-            new_exp = self.skills[skill_id]['exp'] + exp
-            level_up = (new_exp // 100) > (self.skills[skill_id]['exp'] // 100)
-            
-            self.db.execute(
-                "UPDATE skills SET exp = exp + ? WHERE qq_id = ? AND skill_id = ?",
-                (exp, self.qq_id, skill_id)
-            )
-            self.skills[skill_id]['exp'] = new_exp
-            
-            if level_up:
-                new_level = self.skills[skill_id]['exp'] // 100 + 1
-                self.db.execute(
-                    "UPDATE skills SET level = ? WHERE qq_id = ? AND skill_id = ?",
-                    (new_level, self.qq_id, skill_id)
-                )
-                self.skills[skill_id]['level'] = new_level
-                return True
-                
-        return False
-        
-    def update_quest_progress(self, quest_id: str, progress: dict):
-        current = self.quests.get(quest_id, {}).get('progress', {})
-        for key, value in progress.items():
-            current[key] = current.get(key, 0) + value
-            
-        self.db.execute(
-            "UPDATE player_quests SET progress = ? WHERE qq_id = ? AND quest_id = ?",
-            (json.dumps(current), self.qq_id, quest_id)
-        )
-        
-        if quest_id in self.quests:
-            self.quests[quest_id]['progress'] = current
-        else:
-            quest_data = self.db.fetch_one(
-                "SELECT name, type FROM quests WHERE quest_id = ?", (quest_id,)
-            )
-            if quest_data:
-                self.quests[quest_id] = {
-                    'name': quest_data[0],
-                    'type': quest_data[1],
-                    'progress': current,
-                    'is_completed': False
-                }
-                
-    def complete_quest(self, quest_id: str):
-        self.db.execute(
-            """UPDATE player_quests 
-            SET is_completed = TRUE, complete_time = ?
-            WHERE qq_id = ? AND quest_id = ?""",
-            (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), self.qq_id, quest_id)
-        )
-        
-        if quest_id in self.quests:
-            self.quests[quest_id]['is_completed'] = True
-            
-    def get_status(self):
-        """获取玩家状态信息"""
-        status = f"{self.name} ({self.faction}阵营)\n"
-        status += f"境界: {self.realm}-{self.stage}\n"
-        status += f"修为: {self.get_cultivation_progress():.1f}%\n"
-        status += f"生命: {self.health}/{self.max_health}\n"
-        status += f"真元: {self.mana}/{self.max_mana}\n"
-        status += f"攻击: {self.attack} 防御: {self.defense} 速度: {self.speed}\n"
-        status += f"灵石: {self.gold}\n"
-        status += "灵根: " + ", ".join([f"{k}({v}%)" for k, v in self.roots.items()])
-        if self.is_cultivating:
-            status += "\n状态: 正在修炼中"
-        return status
-        
-    def get_cultivation_progress(self):
-        """获取当前境界修炼进度百分比"""
-        # 根据阵营获取对应的境界列表
-        realms_list = self.REALMS.get(self.faction, self.REALMS['中立'])
-        
-        # 确保境界列表是一个列表，而不是字典
-        if isinstance(realms_list, list):
-            try:
-                realm_index = realms_list.index(self.realm)
-                base_exp = 100 * (2 ** realm_index)
-                return min(100, (self.cultivation / base_exp) * 100)
-            except ValueError:
-                # 如果境界不在列表中，返回0
-                return 0
-        else:
-            # 如果获取到的不是列表，记录错误并返回0
-            return 0
-        
-    def get_next_realm(self):
-        """获取下一个大境界，根据阵营返回"""
-        current_realms = self.REALMS.get(self.faction, self.REALMS['中立'])
-        current_index = current_realms.index(self.realm)
-        if current_index + 1 < len(current_realms):
-            return current_realms[current_index + 1]
-        return None
-    
-    def get_inventory(self):
-        """获取玩家的储物袋信息"""
-        inventory = []
-        for item, data in self.items.items():
-            count = data['count']
-            durability = data['durability']
-            if durability is not None:
-                inventory.append(f"{item} x{count} (耐久度: {durability})")
-            else:
-                inventory.append(f"{item} x{count}")
-        if not inventory:
-            return "储物袋为空"
-        return "储物袋内容:\n" + "\n".join(inventory)
-        
-    def transfer_item(self, item_name, count, target_player):
-        """转移道具给其他玩家"""
-        if item_name not in self.items:
-            return f"你没有此道具或道具名错误: {item_name}"
-        if self.items[item_name]['count'] < count:
-            return f"你储物袋内{item_name}不足，无法赠送 {count} 个"
-        if self.qq_id == target_player.qq_id:
-            return "自己的道具无法赠送给自己"
-
-        # 减少当前玩家的道具数量
-        self.items[item_name]['count'] -= count
-        self.db.execute(
-            "UPDATE items SET count = ? WHERE qq_id = ? AND item_id = ?",
-            (self.items[item_name]['count'], self.qq_id, item_name)
-        )
-
-        # 增加目标玩家的道具数量
-        if item_name in target_player.items:
-            target_player.items[item_name]['count'] += count
-            target_player.db.execute(
-                "UPDATE items SET count = ? WHERE qq_id = ? AND item_id = ?",
-                (target_player.items[item_name]['count'], target_player.qq_id, item_name)
-            )
-        else:
-            target_player.items[item_name] = {'count': count, 'durability': None}
-            target_player.db.execute(
-                "INSERT INTO items (qq_id, item_id, count) VALUES (?, ?, ?)",
-                (target_player.qq_id, item_name, count)
-            )
-
-        return f"你成功赠送了 {count} 个 {item_name} 给 {target_player.name}"
-    
-    def calculate_power(self):
-        """计算玩家的实力"""
-        realm_list = self.get_current_realm_list()
-        realm_index = realm_list.index(self.realm)
-        stage_index = self.STAGES.index(self.stage)
-        cultivation_progress = self.get_cultivation_progress()
-        power = realm_index * 1000 + stage_index * 100 + cultivation_progress
-        return power
-    
-    def get_current_realm_list(self):
-        """获取当前阵营的境界列表"""
-        return self.REALMS.get(self.faction, [])
-    
-    def choose_faction(self, faction: str) -> str:
-        """选择阵营"""
-        if faction not in self.REALMS:
-            return f"无效的阵营选择，可选阵营有: {', '.join(self.REALMS.keys())}"
-        if self.faction == faction:
-            return f"你已经属于 {faction} 阵营，无需重复选择。"
-        self.faction = faction
-        self.update()
-        return f"你成功加入了 {faction} 阵营！"
-
-
-    def close(self):
-        self.db.close()
\ No newline at end of file
+from datetime import datetime, timedelta
+from collections import Counter, OrderedDict
+from database import Database
+from catalog import GameCatalog
+from ranking import Leaderboard
+import json
+import random
+import sys
+import threading
+import time
+
+# 区分“属性尚未赋值”和“属性值为None”
+_UNSET = object()
+
+
+class LoadStats(threading.local):
+    """记录当前线程上玩家子集合的按需加载次数，由指令处理方按条取出"""
+
+    def __init__(self):
+        self.loads = Counter()
+
+    def record(self, collection: str):
+        self.loads[collection] += 1
+
+    def take(self) -> Counter:
+        """取出并清空当前统计"""
+        loads, self.loads = self.loads, Counter()
+        return loads
+
+
+load_stats = LoadStats()
+
+
+def _lazy_collection(name: str, loader: str) -> property:
+    """玩家子集合的延迟加载属性：第一次访问时才查询数据库"""
+    attr = '_' + name
+
+    def getter(self):
+        value = getattr(self, attr, None)
+        if value is None:
+            value = getattr(self, loader)()
+            object.__setattr__(self, attr, value)
+            load_stats.record(name)
+        return value
+
+    def setter(self, value):
+        object.__setattr__(self, attr, value)
+
+    return property(getter, setter)
+
+
+class ItemRecord:
+    """储物袋中的一种物品"""
+    __slots__ = ('count', 'durability')
+
+    def __init__(self, count: int, durability: int = None):
+        self.count = count
+        self.durability = durability
+
+    def __repr__(self):
+        return f"ItemRecord(count={self.count}, durability={self.durability})"
+
+
+class SkillRecord:
+    """已学会的一项技能"""
+    __slots__ = ('level', 'exp')
+
+    def __init__(self, level: int = 1, exp: int = 0):
+        self.level = level
+        self.exp = exp
+
+    def __repr__(self):
+        return f"SkillRecord(level={self.level}, exp={self.exp})"
+
+
+class PlayerState:
+    """玩家的内存状态，字段固定在 __slots__ 中，缓存大量玩家时不为每个玩家分配 __dict__
+
+    物品和技能用紧凑的记录对象保存，物品ID、技能ID等字典键做字符串驻留，
+    所有玩家共享同一份键字符串。
+    """
+
+    # players表中可修改的字段，赋值时记录为脏字段，写回时只更新变化的字段
+    COLUMNS = (
+        'name', 'qq_nickname', 'faction', 'realm', 'stage', 'cultivation',
+        'health', 'max_health', 'mana', 'max_mana', 'attack', 'defense', 'speed', 'gold',
+        'last_cultivate', 'last_battle', 'is_cultivating', 'cultivate_start_time',
+        'daily_cultivate_count', 'last_breakthrough_attempt', 'power'
+    )
+    # 决定战力的字段，其中任何一个变化时写回前重新计算 power
+    POWER_FIELDS = frozenset(('realm', 'stage', 'cultivation'))
+    # 内存排行榜展示的字段，其中任何一个变化时提交后同步到排行榜
+    RANKING_FIELDS = frozenset(('power', 'name', 'faction'))
+    COLLECTIONS = ('roots', 'skills', 'items', 'quests')
+
+    __slots__ = COLUMNS + ('qq_id', 'create_time', 'last_active', '_dirty', '_item_journal') + tuple(
+        '_' + name for name in COLLECTIONS)
+
+    def __setattr__(self, name, value):
+        if name in PlayerState.COLUMNS and getattr(self, name, _UNSET) != value:
+            self._dirty.add(name)
+        object.__setattr__(self, name, value)
+
+    def item_count(self, item_id: str) -> int:
+        """储物袋中某物品的数量，没有时为0"""
+        record = self.items.get(item_id)
+        return record.count if record else 0
+
+    def skill_level(self, skill_id: str) -> int:
+        """某项技能的等级，未学会时为0"""
+        record = self.skills.get(skill_id)
+        return record.level if record else 0
+
+
+class Player(PlayerState):
+    __slots__ = ()
+
+    # 所有玩家共用一个数据库门面（底层本就是进程内共享连接），不再每个玩家各持一个
+    _db = None
+
+    REALMS = {
+        '仙域': [
+            '炼体境', '练气境', '筑基境', '金丹境', 
+            '元婴境', '化神境', '渡劫境', '大乘境'
+        ],
+        '魔渊': [
+            '蚀骨境', '聚煞境', '铸魔台', '结魔丹',
+            '化魔胎', '炼狱境', '逆天境', '灭世境'
+        ],
+        '中立': [
+            '炼体境', '练气境', '筑基境', '金丹境',
+            '元婴境', '化神境', '渡劫境', '大乘境'
+        ]
+    }
+    
+    STAGES = ['初期', '中期', '后期', '大圆满']
+
+    # 灵根、技能、物品、任务按需加载，状态、修炼等指令只需查询players表
+    roots = _lazy_collection('roots', 'load_spiritual_roots')
+    skills = _lazy_collection('skills', 'load_skills')
+    items = _lazy_collection('items', 'load_items')
+    quests = _lazy_collection('quests', 'load_quests')
+
+    # 一次查询取回玩家行和全部子集合，子集合用 json_group_object 聚合成JSON（结果最后四列）
+    HYDRATE_QUERY = Database.HOT_QUERIES['player_hydrate']
+    
+    def __init__(self, qq_id: str, qq_nickname: str = None, hydrate: bool = False):
+        self._dirty = set()
+        # 本次事务内尚未写入的物品变化: item_id -> [数量增量, 耐久度, 是否配方, 配方类型]
+        self._item_journal = {}
+        self.qq_id = qq_id
+        self.load_data(qq_nickname, hydrate)
+
+    @property
+    def db(self) -> Database:
+        if Player._db is None:
+            Player._db = Database()
+        return Player._db
+
+    def load_data(self, current_nickname: str = None, hydrate: bool = False):
+        """加载玩家数据，总是使用最新QQ昵称
+
+        不传昵称时只读取已有玩家：玩家不存在时 name 为 None，不会创建新玩家。
+        hydrate 为 True 时一次查询同时取回全部子集合，否则子集合按需加载。
+        """
+        collections = None
+        if hydrate:
+            row = self.db.fetch_one(self.HYDRATE_QUERY, (self.qq_id,))
+            if row:
+                player_data, collections = row[:-4], row[-4:]
+            else:
+                player_data = None
+        else:
+            player_data = self.db.fetch_one(
+                "SELECT * FROM players WHERE qq_id = ?", 
+                (self.qq_id,)
+            )
+
+        if not player_data and current_nickname is None:
+            self.name = None
+            self.roots, self.skills, self.items, self.quests = {}, {}, {}, {}
+            return
+        if not player_data:
+            self.initialize_new_player(current_nickname)
+        else:
+            self.name = player_data[1]
+            self.qq_nickname = player_data[2]  # 获取 qq_nickname 字段
+            # 阵营、境界、阶段取值很少，驻留后所有玩家共享同一个字符串
+            self.faction = sys.intern(player_data[3])
+            self.realm = sys.intern(player_data[4])
+            self.stage = sys.intern(player_data[5])
+            self.cultivation = player_data[6]
+            self.health = player_data[7]
+            self.max_health = player_data[8]
+            self.mana = player_data[9]
+            self.max_mana = player_data[10]
+            self.attack = player_data[11]
+            self.defense = player_data[12]
+            self.speed = player_data[13]
+            self.gold = player_data[14]
+            self.create_time = player_data[15]
+            self.last_active = player_data[16]
+            self.last_cultivate = player_data[17] if player_data[17] else ""
+            self.last_battle = player_data[18] if player_data[18] else ""
+            self.is_cultivating = bool(player_data[19]) if player_data[19] is not None else False
+            self.cultivate_start_time = player_data[20] if player_data[20] else None
+            self.daily_cultivate_count = player_data[21] if player_data[21] is not None else 0
+            self.last_breakthrough_attempt = player_data[22] if player_data[22] else None
+            self.power = player_data[23] or 0
+            self._dirty.clear()
+            if collections:
+                self._fill_collections(collections)
+
+            # 昵称有变化时才更新为最新QQ昵称
+            if current_nickname:
+                self.name = self.qq_nickname = current_nickname
+                self.update()
+
+
+    def initialize_new_player(self, qq_nickname: str):
+        """初始化新玩家，使用QQ昵称"""
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.name = qq_nickname  # 直接使用QQ昵称
+        self.qq_nickname = qq_nickname
+        self.faction = "中立"
+        self.realm = "炼体境"
+        self.stage = "初期"
+        self.cultivation = 0
+        self.health = 100
+        self.max_health = 100
+        self.mana = 100
+        self.max_mana = 100
+        self.attack = 10
+        self.defense = 5
+        self.speed = 5
+        self.gold = 100
+        self.create_time = now
+        self.last_active = now
+        self.last_cultivate = None
+        self.last_battle = None
+        self.is_cultivating = False
+        self.cultivate_start_time = None
+        self.daily_cultivate_count = 0
+        self.last_breakthrough_attempt = None
+        self.power = self.calculate_power()
+        with self.db.transaction():
+            self._insert_new_player()
+
+    def _insert_new_player(self):
+        """写入新玩家的基础数据、灵根、初始技能、物品和任务"""
+        # 随机生成灵根
+        root_types = ['金', '木', '水', '火', '土']
+        main_root = random.choice(root_types)
+        purity = random.randint(60, 90)
+        
+        self.db.execute(
+            """INSERT INTO players 
+            (qq_id, name, qq_nickname, faction, realm, stage, cultivation, health, max_health, 
+             mana, max_mana, attack, defense, speed, gold, create_time, last_active,
+             is_cultivating, cultivate_start_time, daily_cultivate_count, last_breakthrough_attempt, power)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (self.qq_id, self.name, self.qq_nickname, self.faction, self.realm, self.stage, 
+             self.cultivation, self.health, self.max_health, self.mana, 
+             self.max_mana, self.attack, self.defense, self.speed, 
+             self.gold, self.create_time, self.last_active,
+             self.is_cultivating, self.cultivate_start_time, self.daily_cultivate_count,
+             self.last_breakthrough_attempt, self.power)
+        )
+        self._sync_leaderboard()
+        self._dirty.clear()
+        
+        # 添加灵根
+        self.db.execute(
+            "INSERT INTO spiritual_roots (qq_id, root_type, purity) VALUES (?, ?, ?)",
+            (self.qq_id, main_root, purity)
+        )
+        
+        # 添加初始技能
+        initial_skills = ['基础吐纳', '基础剑法']
+        for skill in initial_skills:
+            self.db.execute(
+                "INSERT INTO skills (qq_id, skill_id, level) VALUES (?, ?, 1)",
+                (self.qq_id, skill)
+            )
+        
+        # 添加初始物品
+        initial_items = {'灵草': 5, '符纸': 10, '朱砂': 5}
+        for item, count in initial_items.items():
+            self.db.execute(
+                "INSERT INTO items (qq_id, item_id, count) VALUES (?, ?, ?)",
+                (self.qq_id, item, count)
+            )
+        
+        # 接受初始任务
+        self.db.execute(
+            "INSERT INTO player_quests (qq_id, quest_id) VALUES (?, 'main_1')",
+            (self.qq_id,)
+        )
+        
+        self.roots = {main_root: purity}
+        self.skills = {sys.intern(skill): SkillRecord() for skill in initial_skills}
+        self.items = {sys.intern(item): ItemRecord(count) for item, count in initial_items.items()}
+        self.quests = {'main_1': {'progress': {}, 'is_completed': False}}
+        
+    def hydrate(self):
+        """一次查询补齐尚未加载的子集合，已加载的保持不变"""
+        if all(getattr(self, '_' + name, None) is not None for name in self.COLLECTIONS):
+            return
+        row = self.db.fetch_one(self.HYDRATE_QUERY, (self.qq_id,))
+        if row:
+            self._fill_collections(row[-4:])
+
+    def _fill_collections(self, collections):
+        """解析 HYDRATE_QUERY 聚合出的四个JSON对象"""
+        roots, skills, items, quests = (json.loads(c) if c else {} for c in collections)
+        parsed = {
+            'roots': {sys.intern(k): v for k, v in roots.items()},
+            'skills': {sys.intern(k): SkillRecord(*v) for k, v in skills.items()},
+            'items': {sys.intern(k): ItemRecord(*v) for k, v in items.items()},
+            'quests': {sys.intern(k): {
+                'name': v[0],
+                'type': v[1],
+                'progress': json.loads(v[2]) if v[2] else {},
+                'is_completed': bool(v[3])
+            } for k, v in quests.items()},
+        }
+        for name, value in parsed.items():
+            if getattr(self, '_' + name, None) is None:
+                object.__setattr__(self, '_' + name, value)
+        load_stats.record('hydrate')
+
+    def load_spiritual_roots(self):
+        roots_data = self.db.fetch_all(
+            "SELECT root_type, purity FROM spiritual_roots WHERE qq_id = ?", (self.qq_id,)
+        )
+        return {sys.intern(root[0]): root[1] for root in roots_data} if roots_data else {}
+        
+    def load_skills(self):
+        skills_data = self.db.fetch_all(
+            "SELECT skill_id, level, exp FROM skills WHERE qq_id = ?", (self.qq_id,)
+        )
+        return {sys.intern(skill[0]): SkillRecord(skill[1], skill[2]) for skill in skills_data} if skills_data else {}
+        
+    def load_items(self):
+        items_data = self.db.fetch_all(
+            "SELECT item_id, count, durability FROM items WHERE qq_id = ?", (self.qq_id,)
+        )
+        return {sys.intern(item[0]): ItemRecord(item[1], item[2]) for item in items_data} if items_data else {}
+        
+    def load_quests(self):
+        quests_data = self.db.fetch_all(
+            """SELECT q.quest_id, q.name, q.type, pq.progress, pq.is_completed 
+            FROM player_quests pq JOIN quests q ON pq.quest_id = q.quest_id 
+            WHERE pq.qq_id = ?""", (self.qq_id,)
+        )
+        return {sys.intern(quest[0]): {
+            'name': quest[1],
+            'type': quest[2],
+            'progress': json.loads(quest[3]) if quest[3] else {},
+            'is_completed': bool(quest[4])
+        } for quest in quests_data} if quests_data else {}
+        
+    def update(self):
+        """写回玩家数据：事务内推迟到提交前统一写一次，事务外立即写入"""
+        self.db.defer(('player', id(self)), self.save)
+
+    def save(self):
+        """只写回发生变化的字段，没有变化时不写数据库"""
+        if not self._dirty:
+            return
+        # 境界、阶段或修为变化时同步更新持久化的战力，天骄榜直接按 power 列排序
+        if not self._dirty.isdisjoint(self.POWER_FIELDS):
+            self.power = self.calculate_power()
+        columns = [c for c in self.COLUMNS if c in self._dirty]
+        self.last_active = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        assignments = ", ".join(f"{c} = ?" for c in columns)
+        self.db.execute(
+            f"UPDATE players SET {assignments}, last_active = ? WHERE qq_id = ?",
+            tuple(getattr(self, c) for c in columns) + (self.last_active, self.qq_id)
+        )
+        if not self._dirty.isdisjoint(self.RANKING_FIELDS):
+            self._sync_leaderboard()
+        self._dirty.clear()
+
+    def _sync_leaderboard(self):
+        """事务提交后把战力、名字和阵营同步到内存排行榜，回滚时不同步"""
+        entry = (self.qq_id, self.power, self.name, self.faction)
+        self.db.on_commit(lambda: Leaderboard.shared().update(*entry))
+        
+    def start_cultivation(self):
+        """开始修炼"""
+        self.is_cultivating = True
+        self.cultivate_start_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        
+        # 更新每日修炼次数
+        today = datetime.now().strftime("%Y-%m-%d")
+        if self.last_cultivate and self.last_cultivate.startswith(today):
+            self.daily_cultivate_count += 1
+        else:
+            self.daily_cultivate_count = 1
+            
+        self.last_cultivate = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.update()
+        
+    def complete_cultivation(self):
+        """完成修炼"""
+        self.is_cultivating = False
+        self.cultivate_start_time = None
+        self.update()
+        
+    def add_item(self, item_id: str, count: int = 1, durability: int = None,
+                 is_recipe: bool = False, recipe_type: str = None):
+        if item_id in self.items:
+            self.items[item_id].count += count
+        else:
+            self.items[sys.intern(item_id)] = ItemRecord(count, durability)
+        self._journal_item(item_id, count, durability, is_recipe, recipe_type)
+            
+    def remove_item(self, item_id: str, count: int = 1) -> bool:
+        if self.item_count(item_id) < count:
+            return False
+            
+        if self.items[item_id].count == count:
+            del self.items[item_id]
+        else:
+            self.items[item_id].count -= count
+        self._journal_item(item_id, -count)
+            
+        return True
+
+    def _journal_item(self, item_id: str, delta: int, durability: int = None,
+                      is_recipe: bool = False, recipe_type: str = None):
+        """记录一次物品数量变化，事务提交前由 flush_items 统一写入"""
+        entry = self._item_journal.get(item_id)
+        if entry is None:
+            self._item_journal[item_id] = [delta, durability, is_recipe, recipe_type]
+        else:
+            entry[0] += delta
+        self.db.defer(('items', id(self)), self.flush_items)
+
+    def flush_items(self):
+        """把物品变化合并写入：一次批量UPSERT，数量归零的物品一次删除"""
+        if not self._item_journal:
+            return
+        journal, self._item_journal = self._item_journal, {}
+        self.db.executemany(
+            """INSERT INTO items (qq_id, item_id, count, durability, is_recipe, recipe_type)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(qq_id, item_id) DO UPDATE SET count = count + excluded.count""",
+            [(self.qq_id, item_id, delta, durability, is_recipe, recipe_type)
+             for item_id, (delta, durability, is_recipe, recipe_type) in journal.items()
+             if delta]
+        )
+        if any(item_id not in self.items for item_id in journal):
+            self.db.execute(
+                "DELETE FROM items WHERE qq_id = ? AND count <= 0",
+                (self.qq_id,)
+            )
+        
+    def add_skill_exp(self, skill_id: str, exp: int):
+        if skill_id not in self.skills:
+            self.db.execute(
+                "INSERT INTO skills (qq_id, skill_id, level, exp) VALUES (?, ?, 1, ?)",
+                (self.qq_id, skill_id, exp)
+            )
+            self.skills[sys.intern(skill_id)] = SkillRecord(1, exp)
+        else:
+            skill = self.skills[skill_id]
+            new_exp = skill.exp + exp
+            level_up = (new_exp // 100) > (skill.exp // 100)
+            
+            self.db.execute(
+                "UPDATE skills SET exp = exp + ? WHERE qq_id = ? AND skill_id = ?",
+                (exp, self.qq_id, skill_id)
+            )
+            skill.exp = new_exp
+            
+            if level_up:
+                new_level = skill.exp // 100 + 1
+                self.db.execute(
+                    "UPDATE skills SET level = ? WHERE qq_id = ? AND skill_id = ?",
+                    (new_level, self.qq_id, skill_id)
+                )
+                skill.level = new_level
+                return True
+                
+        return False
+        
+    def update_quest_progress(self, quest_id: str, progress: dict):
+        current = self.quests.get(quest_id, {}).get('progress', {})
+        for key, value in progress.items():
+            current[key] = current.get(key, 0) + value
+            
+        self.db.execute(
+            "UPDATE player_quests SET progress = ? WHERE qq_id = ? AND quest_id = ?",
+            (json.dumps(current), self.qq_id, quest_id)
+        )
+        
+        if quest_id in self.quests:
+            self.quests[quest_id]['progress'] = current
+        else:
+            quest_data = GameCatalog.shared().quests.get(quest_id)
+            if quest_data:
+                self.quests[quest_id] = {
+                    'name': quest_data.name,
+                    'type': quest_data.type,
+                    'progress': current,
+                    'is_completed': False
+                }
+                
+    def complete_quest(self, quest_id: str):
+        self.db.execute(
+            """UPDATE player_quests 
+            SET is_completed = TRUE, complete_time = ?
+            WHERE qq_id = ? AND quest_id = ?""",
+            (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), self.qq_id, quest_id)
+        )
+        
+        if quest_id in self.quests:
+            self.quests[quest_id]['is_completed'] = True
+            
+    def get_status(self):
+        """获取玩家状态信息"""
+        status = f"{self.name} ({self.faction}阵营)\n"
+        status += f"境界: {self.realm}-{self.stage}\n"
+        status += f"修为: {self.get_cultivation_progress():.1f}%\n"
+        status += f"生命: {self.health}/{self.max_health}\n"
+        status += f"真元: {self.mana}/{self.max_mana}\n"
+        status += f"攻击: {self.attack} 防御: {self.defense} 速度: {self.speed}\n"
+        status += f"灵石: {self.gold}\n"
+        status += "灵根: " + ", ".join([f"{k}({v}%)" for k, v in self.roots.items()])
+        if self.is_cultivating:
+            status += "\n状态: 正在修炼中"
+        return status
+        
+    def get_cultivation_progress(self):
+        """获取当前境界修炼进度百分比"""
+        # 根据阵营获取对应的境界列表
+        realms_list = self.REALMS.get(self.faction, self.REALMS['中立'])
+        
+        # 确保境界列表是一个列表，而不是字典
+        if isinstance(realms_list, list):
+            try:
+                realm_index = realms_list.index(self.realm)
+                base_exp = 100 * (2 ** realm_index)
+                return min(100, (self.cultivation / base_exp) * 100)
+            except ValueError:
+                # 如果境界不在列表中，返回0
+                return 0
+        else:
+            # 如果获取到的不是列表，记录错误并返回0
+            return 0
+        
+    def get_next_realm(self):
+        """获取下一个大境界，根据阵营返回"""
+        current_realms = self.REALMS.get(self.faction, self.REALMS['中立'])
+        current_index = current_realms.index(self.realm)
+        if current_index + 1 < len(current_realms):
+            return current_realms[current_index + 1]
+        return None
+    
+    def get_inventory(self):
+        """获取玩家的储物袋信息"""
+        inventory = []
+        for item, data in self.items.items():
+            count = data.count
+            durability = data.durability
+            if durability is not None:
+                inventory.append(f"{item} x{count} (耐久度: {durability})")
+            else:
+                inventory.append(f"{item} x{count}")
+        if not inventory:
+            return "储物袋为空"
+        return "储物袋内容:\n" + "\n".join(inventory)
+        
+    def transfer_item(self, item_name, count, target_player):
+        """转移道具给其他玩家"""
+        result = self.transfer_items({item_name: count}, target_player)
+        if result:
+            return result
+        return f"你成功赠送了 {count} 个 {item_name} 给 {target_player.name}"
+
+    def transfer_items(self, items: dict, target_player) -> str:
+        """把多种道具一次性转给其他玩家，成功返回None，失败返回原因
+
+        扣减和入账在同一连接的同一事务里完成：扣减带 count >= ? 条件，
+        任何一种道具数量不足都整体撤销，道具不会凭空产生或丢失。
+        """
+        if self.qq_id == target_player.qq_id:
+            return "自己的道具无法赠送给自己"
+        if not target_player.name:
+            return "找不到赠送对象"
+        for item_name, count in items.items():
+            if count <= 0:
+                return "赠送数量必须大于0"
+            if item_name not in self.items:
+                return f"你没有此道具或道具名错误: {item_name}"
+            if self.items[item_name].count < count:
+                return f"你储物袋内{item_name}不足，无法赠送 {count} 个"
+
+        with self.db.transaction():
+            # 先写入双方尚未落盘的物品变化，条件扣减才能看到最新数量
+            self.flush_items()
+            target_player.flush_items()
+            self.db.execute("SAVEPOINT transfer_items")
+            for item_name, count in items.items():
+                cursor = self.db.execute(
+                    """UPDATE items SET count = count - ?
+                    WHERE qq_id = ? AND item_id = ? AND count >= ?""",
+                    (count, self.qq_id, item_name, count)
+                )
+                if cursor.rowcount == 0:
+                    self.db.execute("ROLLBACK TO transfer_items")
+                    self.db.execute("RELEASE transfer_items")
+                    # 内存中的数量已经过期，按数据库重新加载
+                    self.items = self.load_items()
+                    return f"你储物袋内{item_name}不足，无法赠送 {count} 个"
+            # 入账从赠送方的记录复制配方标记和耐久，对方原来没有这种道具时也能学习配方、保留耐久
+            self.db.executemany(
+                """INSERT INTO items (qq_id, item_id, count, durability, is_recipe, recipe_type)
+                SELECT ?, item_id, ?, durability, is_recipe, recipe_type
+                FROM items WHERE qq_id = ? AND item_id = ?
+                ON CONFLICT(qq_id, item_id) DO UPDATE SET count = count + excluded.count""",
+                [(target_player.qq_id, count, self.qq_id, item_name) for item_name, count in items.items()]
+            )
+            self.db.execute(
+                "DELETE FROM items WHERE qq_id = ? AND count <= 0",
+                (self.qq_id,)
+            )
+            self.db.execute("RELEASE transfer_items")
+
+        # 同步内存中的数量（对方的物品尚未加载时，下次加载会直接读到新数量）
+        for item_name, count in items.items():
+            record = self.items[item_name]
+            record.count -= count
+            if record.count <= 0:
+                del self.items[item_name]
+            target_items = getattr(target_player, '_items', None)
+            if target_items is not None:
+                if item_name in target_items:
+                    target_items[item_name].count += count
+                else:
+                    target_items[sys.intern(item_name)] = ItemRecord(count, record.durability)
+        return None
+    
+    def calculate_power(self):
+        """计算玩家的实力"""
+        return Database.power_score(self.realm, self.stage, self.cultivation)
+    
+    def get_current_realm_list(self):
+        """获取当前阵营的境界列表"""
+        return self.REALMS.get(self.faction, [])
+    
+    def choose_faction(self, faction: str) -> str:
+        """选择阵营"""
+        if faction not in self.REALMS:
+            return f"无效的阵营选择，可选阵营有: {', '.join(self.REALMS.keys())}"
+        if self.faction == faction:
+            return f"你已经属于 {faction} 阵营，无需重复选择。"
+        self.faction = faction
+        self.update()
+        return f"你成功加入了 {faction} 阵营！"
+
+
+    def close(self):
+        self.db.close()
+
+
+class PlayerCache:
+    """已加载玩家的身份映射：按qq_id缓存，LRU限制容量，空闲超时淘汰
+
+    同一玩家在进程内只有一个Player对象，活跃玩家的连续消息直接命中内存。
+    事务内取用的玩家在提交前统一写回，事务回滚时从缓存中移除。
+    """
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, max_size: int = 5000, ttl: timedelta = timedelta(minutes=30)):
+        self.db = Database()
+        self.max_size = max_size
+        self.ttl = ttl.total_seconds()
+        # qq_id -> (Player, 最后访问时间)，按访问顺序排列
+        self._players = OrderedDict()
+        self._lock = threading.RLock()
+
+    @classmethod
+    def shared(cls) -> "PlayerCache":
+        """获取进程内共享的玩家缓存"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def get(self, qq_id: str, qq_nickname: str = None, hydrate: bool = False) -> Player:
+        """获取玩家，传入昵称时玩家不存在会自动创建，昵称变化会同步更新
+
+        hydrate 为 True 时保证全部子集合已加载（未命中时随玩家行一次查询取回）。
+        """
+        now = time.monotonic()
+        renamed = False
+        with self._lock:
+            self._evict_idle(now)
+            entry = self._players.pop(qq_id, None)
+            if entry:
+                player = entry[0]
+                if qq_nickname and player.name != qq_nickname:
+                    player.name = player.qq_nickname = qq_nickname
+                    renamed = True
+                if hydrate:
+                    player.hydrate()
+            else:
+                player = Player(qq_id, qq_nickname, hydrate)
+                if not player.name:
+                    # 不存在的玩家不缓存
+                    return player
+            self._players[qq_id] = (player, now)
+            while len(self._players) > self.max_size:
+                self._players.popitem(last=False)
+
+        if renamed or self.db.in_transaction():
+            # 本次事务内取用的玩家在提交前写回
+            player.update()
+            self.db.on_rollback(lambda: self.evict(qq_id))
+        return player
+
+    def _evict_idle(self, now: float):
+        """淘汰空闲超时的玩家（按访问顺序，只需检查最前面的几个）"""
+        while self._players:
+            qq_id, (player, last_access) = next(iter(self._players.items()))
+            if now - last_access < self.ttl:
+                break
+            del self._players[qq_id]
+
+    def evict(self, qq_id: str):
+        with self._lock:
+            self._players.pop(qq_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._players.clear()
+
+    def __len__(self):
+        return len(self._players)
@@ -1,57 +1,221 @@
-import os
-from PIL import Image, ImageDraw, ImageFont
-from database import Database
-from player import Player
-
-class RankingSystem:
-    def __init__(self):
-        self.db = Database()
-
-    def get_ranking(self, page=1, page_size=10):
-        """获取排行榜数据"""
-        offset = (page - 1) * page_size
-        players_data = self.db.fetch_all(
-            "SELECT qq_id, qq_nickname FROM players ORDER BY realm DESC, stage DESC, cultivation DESC LIMIT ? OFFSET ?",
-            (page_size, offset)
-        )
-        ranking = []
-        for data in players_data:
-            if isinstance(data, tuple) and len(data) > 0:
-                try:
-                    qq_id, qq_nickname = data
-                    player = Player(qq_id, qq_nickname)
-                    ranking.append({
-                        'name': player.name,
-                        'faction': player.faction,
-                        'power': player.calculate_power() if hasattr(player, 'calculate_power') else 0
-                    })
-                    player.close()
-                except Exception as e:
-                    print(f"处理玩家数据时出错，QQ ID: {qq_id if 'qq_id' in locals() else '未知'}, 错误信息: {e}")
-            else:
-                print(f"数据格式错误，跳过该数据: {data}")
-        return ranking
-
-    def generate_ranking_image(self, ranking, page):
-        """生成排行榜图片"""
-        image = Image.new('RGB', (300, len(ranking) * 30 + 50), color=(255, 255, 255))
-        draw = ImageDraw.Draw(image)
-        # 指定支持中文的字体文件，这里假设系统中有 simhei.ttf 字体，你可以根据实际情况修改
-        font_path = 'simhei.ttf'
-        if not os.path.exists(font_path):
-            print(f"字体文件 {font_path} 不存在，请检查。")
-            return None
-        font = ImageFont.truetype(font_path, 18)
-
-        draw.text((10, 10), f"天骄榜 第 {page} 页", fill=(0, 0, 0), font=font)
-        y = 40
-        for i, player in enumerate(ranking, start=(page - 1) * 10 + 1):
-            text = f"{i}. {player['name']} ({player['faction']}阵营)"
-            draw.text((10, y), text, fill=(0, 0, 0), font=font)
-            y += 30
-
-        # 使用绝对路径保存图片
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        image_path = os.path.join(current_dir, f"ranking_page_{page}.png")
-        image.save(image_path)
-        return image_path
\ No newline at end of file
+import random
+import threading
+from database import Database
+
+
+class _SkipNode:
+    __slots__ = ('key', 'value', 'next', 'width')
+
+    def __init__(self, key, value, level: int):
+        self.key = key
+        self.value = value
+        self.next = [None] * level
+        # width[i]: 沿第 i 层走到下一个节点跨过的底层节点数，用于按名次定位
+        self.width = [1] * level
+
+
+class Leaderboard:
+    """内存中的天骄榜：按 (战力降序, qq_id) 排列的可索引跳表
+
+    插入、删除、按名次取值、查询名次都是 O(log n)，取一页再加 O(k)。
+    启动时从数据库按战力索引整体重建，之后在玩家战力、名字或阵营变化的事务提交后增量更新。
+    """
+
+    MAX_LEVEL = 24
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clear()
+        self.loaded = False
+
+    @classmethod
+    def shared(cls) -> "Leaderboard":
+        """获取进程内共享的排行榜"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def _clear(self):
+        # 尾哨兵的key大于任何玩家的key
+        self._tail = _SkipNode((float('inf'), ''), None, 0)
+        self._head = _SkipNode(None, None, self.MAX_LEVEL)
+        self._head.next = [self._tail] * self.MAX_LEVEL
+        # qq_id -> 跳表中的key
+        self._keys = {}
+
+    @staticmethod
+    def _key(qq_id: str, power: float) -> tuple:
+        return (-power, qq_id)
+
+    def _random_level(self) -> int:
+        level = 1
+        while level < self.MAX_LEVEL and random.random() < 0.5:
+            level += 1
+        return level
+
+    def load(self, db: Database):
+        """按战力索引顺序读出全部玩家，顺序追加一次建成跳表，O(n)"""
+        with self._lock:
+            rows = db.fetch_all(db.HOT_QUERIES['ranking_page'], (-1, 0))
+            self._clear()
+            last = [self._head] * self.MAX_LEVEL
+            last_pos = [0] * self.MAX_LEVEL
+            for pos, (qq_id, name, faction, power) in enumerate(rows, start=1):
+                key = self._key(qq_id, power or 0)
+                node = _SkipNode(key, (name, faction), self._random_level())
+                for level in range(len(node.next)):
+                    last[level].next[level] = node
+                    last[level].width[level] = pos - last_pos[level]
+                    last[level], last_pos[level] = node, pos
+                self._keys[qq_id] = key
+            end = len(rows) + 1
+            for level in range(self.MAX_LEVEL):
+                last[level].next[level] = self._tail
+                last[level].width[level] = end - last_pos[level]
+            self.loaded = True
+
+    def update(self, qq_id: str, power: float, name: str, faction: str):
+        """玩家战力或展示信息变化后更新；尚未加载时忽略，加载时会读到已提交的数据"""
+        with self._lock:
+            if not self.loaded:
+                return
+            old_key = self._keys.get(qq_id)
+            if old_key is not None:
+                self._remove(old_key)
+            key = self._key(qq_id, power or 0)
+            self._insert(key, (name, faction))
+            self._keys[qq_id] = key
+
+    def remove(self, qq_id: str):
+        with self._lock:
+            key = self._keys.pop(qq_id, None)
+            if key is not None:
+                self._remove(key)
+
+    def _find_chain(self, key):
+        """每一层最后一个key小于给定key的节点，以及到达它们经过的名次"""
+        chain = [None] * self.MAX_LEVEL
+        positions = [0] * self.MAX_LEVEL
+        node, pos = self._head, 0
+        for level in reversed(range(self.MAX_LEVEL)):
+            while node.next[level].key < key:
+                pos += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+            positions[level] = pos
+        return chain, positions
+
+    def _insert(self, key, value):
+        chain, positions = self._find_chain(key)
+        node = _SkipNode(key, value, self._random_level())
+        pos = positions[0] + 1
+        for level in range(len(node.next)):
+            prev = chain[level]
+            node.next[level] = prev.next[level]
+            prev.next[level] = node
+            node.width[level] = prev.width[level] - (pos - positions[level]) + 1
+            prev.width[level] = pos - positions[level]
+        for level in range(len(node.next), self.MAX_LEVEL):
+            chain[level].width[level] += 1
+
+    def _remove(self, key):
+        chain, _ = self._find_chain(key)
+        node = chain[0].next[0]
+        for level in range(len(node.next)):
+            prev = chain[level]
+            prev.width[level] += node.width[level] - 1
+            prev.next[level] = node.next[level]
+        for level in range(len(node.next), self.MAX_LEVEL):
+            chain[level].width[level] -= 1
+
+    def _node_at(self, index: int):
+        """第 index 名（从0开始）的节点"""
+        node, remaining = self._head, index + 1
+        for level in reversed(range(self.MAX_LEVEL)):
+            while node.width[level] <= remaining:
+                remaining -= node.width[level]
+                node = node.next[level]
+        return node
+
+    @staticmethod
+    def _entry(node) -> dict:
+        name, faction = node.value
+        return {'qq_id': node.key[1], 'name': name, 'faction': faction, 'power': -node.key[0]}
+
+    def _slice(self, offset: int, k: int) -> list:
+        if offset >= len(self._keys) or k <= 0:
+            return []
+        node, entries = self._node_at(offset), []
+        while node is not self._tail and len(entries) < k:
+            entries.append(self._entry(node))
+            node = node.next[0]
+        return entries
+
+    def top(self, k: int, offset: int = 0) -> list:
+        """从第 offset 名（从0开始）起的 k 名玩家"""
+        with self._lock:
+            return self._slice(max(0, offset), k)
+
+    def rank_of(self, qq_id: str):
+        """玩家名次（从1开始），不在榜上时返回None"""
+        with self._lock:
+            return self._rank_of(qq_id)
+
+    def _rank_of(self, qq_id: str):
+        key = self._keys.get(qq_id)
+        if key is None:
+            return None
+        node, rank = self._head, 0
+        for level in reversed(range(self.MAX_LEVEL)):
+            while node.next[level].key <= key:
+                rank += node.width[level]
+                node = node.next[level]
+        return rank
+
+    def around(self, qq_id: str, n: int) -> list:
+        """玩家前后各 n 名（含自己），返回 (名次, 玩家) 列表"""
+        with self._lock:
+            rank = self._rank_of(qq_id)
+            if rank is None:
+                return []
+            start = max(0, rank - 1 - n)
+            entries = self._slice(start, rank - start + n)
+            return list(enumerate(entries, start=start + 1))
+
+    def __len__(self):
+        return len(self._keys)
+
+
+class RankingSystem:
+    def __init__(self):
+        self.db = Database()
+
+    @property
+    def leaderboard(self) -> Leaderboard:
+        """进程内共享的排行榜，首次使用时从数据库加载"""
+        board = Leaderboard.shared()
+        if not board.loaded:
+            board.load(self.db)
+        return board
+
+    def get_ranking(self, page=1, page_size=10):
+        """获取排行榜数据"""
+        offset = (page - 1) * page_size
+        # 直接从内存排行榜取一页，不访问数据库
+        return self.leaderboard.top(page_size, offset)
+
+    def get_rank(self, qq_id: str, n: int = 2):
+        """玩家名次和前后各 n 名，玩家不在榜上时返回 (None, [])"""
+        board = self.leaderboard
+        return board.rank_of(qq_id), board.around(qq_id, n)
+
+    def format_ranking(self, ranking, page=1, page_size=10):
+        """排行榜文本，交给 render 按 ranking 布局渲染成图片"""
+        lines = [f"天骄榜 第 {page} 页"]
+        for i, player in enumerate(ranking, start=(page - 1) * page_size + 1):
+            lines.append(f"{i}. {player['name']} ({player['faction']}阵营) 战力: {player['power']:.0f}")
+        return "\n".join(lines)
@@ -0,0 +1,352 @@
+import base64
+import hashlib
+import io
+import json
+import os
+import tempfile
+import time
+import uuid
+from collections import OrderedDict
+from functools import lru_cache
+from PIL import Image as PILImage
+from PIL import ImageDraw, ImageFont
+
+# 各类图片的布局参数，参与缓存key的计算：修改任何一项都会得到新的图片，旧缓存自然失效
+# 字体指定支持中文的字体文件，这里假设系统中有 simhei.ttf 字体，你可以根据实际情况修改
+LAYOUTS = {
+    'help': {
+        'font': 'simhei.ttf',
+        'image_width': 800,       # 图片宽度
+        'font_size': 20,          # 字体大小
+        'line_spacing': 25,
+        'paragraph_spacing': 30,  # 段落间距
+        'margin': 20,
+        'byte_budget': 64 * 1024,  # 编码后的字节预算
+        'lossy': False,           # 是否允许有损格式（客户端支持时才打开）
+    },
+    'ranking': {
+        'font': 'simhei.ttf',
+        'image_width': 420,
+        'font_size': 18,
+        'line_spacing': 30,
+        'paragraph_spacing': 10,
+        'margin': 10,
+        'byte_budget': 16 * 1024,
+        'lossy': False,
+    },
+}
+
+# 白底黑字，直接在灰度画布上绘制
+BACKGROUND_COLOR = 255
+TEXT_COLOR = 0
+
+# 灰度量化查找表：抗锯齿边缘保留4级灰度，调色板PNG每像素只需2位
+_GRAY4_LUT = [(v * 3 + 127) // 255 * 85 for v in range(256)]
+# 二值化查找表
+_MONO_LUT = [255 if v > 140 else 0 for v in range(256)]
+
+# 编码候选，按画质从高到低依次尝试，取第一个不超过字节预算的结果：(格式, 说明, 编码函数)
+_ENCODINGS = (
+    ('PNG', '4级灰度调色板', lambda img: _save(img.point(_GRAY4_LUT).quantize(4), 'PNG', bits=2)),
+    ('PNG', '1位黑白', lambda img: _save(img.point(_MONO_LUT).convert('1'), 'PNG', optimize=True)),
+)
+# 有损候选，只在布局允许时尝试；白底文字用JPEG往往比调色板PNG更大，只在预算很紧时才可能更小
+_LOSSY_ENCODINGS = (
+    ('JPEG', 'JPEG质量60', lambda img: _save(img, 'JPEG', quality=60)),
+    ('JPEG', 'JPEG质量35', lambda img: _save(img, 'JPEG', quality=35)),
+)
+
+# 需要持久保存的图片（帮助图片）放在源码旁的目录中，重启后直接读取
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'image_cache')
+# 需要文件路径的接口使用的临时目录，优先放在内存文件系统上
+SPILL_DIR = os.path.join('/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir(), 'xiuxian_images')
+
+
+@lru_cache(maxsize=16)
+def get_font(path: str, size: int):
+    """每种字体和字号只加载一次"""
+    return ImageFont.truetype(path, size)
+
+
+@lru_cache(maxsize=16)
+def _char_widths(path: str, size: int) -> dict:
+    """字体的字符宽度表，换行时逐字符累加，量过的字符不再重新测量"""
+    return {}
+
+
+@lru_cache(maxsize=4096)
+def _line_mask(line: str, path: str, size: int):
+    """单行文字的灰度位图；帮助文本和排行榜中重复的行只光栅化一次，之后直接贴图"""
+    font = get_font(path, size)
+    right, bottom = font.getbbox(line)[2:]
+    mask = PILImage.new('L', (max(1, right), max(1, bottom)), 0)
+    ImageDraw.Draw(mask).text((0, 0), line, fill=255, font=font)
+    return mask
+
+
+def clear_caches():
+    """清空字体、字宽和行位图缓存（基准测试对比冷启动时使用）"""
+    get_font.cache_clear()
+    _char_widths.cache_clear()
+    _line_mask.cache_clear()
+
+
+def wrap_line(line: str, font, widths: dict, max_width: float) -> list:
+    """按实际像素宽度换行，中文按字断行，英文尽量在空格处断开"""
+    lines, start, width, last_space = [], 0, 0.0, -1
+    for i, char in enumerate(line):
+        advance = widths.get(char)
+        if advance is None:
+            advance = widths[char] = font.getlength(char)
+        if width + advance > max_width and i > start:
+            # 当前行放不下：有空格时在空格处断开，否则在这个字符前断开
+            cut = last_space if last_space > start else i
+            lines.append(line[start:cut].rstrip())
+            start = cut + 1 if cut == last_space else cut
+            width = sum(widths[c] for c in line[start:i])
+            last_space = -1
+        if char == ' ':
+            last_space = i
+        width += advance
+    lines.append(line[start:].rstrip())
+    return lines
+
+
+def layout_text(text: str, layout: dict):
+    """一遍完成排版：返回每行的 (纵坐标, 文字) 和图片高度
+
+    空行分隔段落，段落之间额外加段落间距；段内的换行保留，过长的行按像素宽度自动换行。
+    """
+    path, size = layout['font'], layout['font_size']
+    font, widths = get_font(path, size), _char_widths(path, size)
+    margin, line_spacing = layout['margin'], layout['line_spacing']
+    max_width = layout['image_width'] - 2 * margin
+    ascent, descent = font.getmetrics()
+
+    placed, y = [], margin
+    paragraphs = [p.strip('\n') for p in text.split('\n\n')]
+    for paragraph in filter(None, paragraphs):
+        if placed:
+            y += layout['paragraph_spacing']
+        for raw_line in paragraph.split('\n'):
+            for line in wrap_line(raw_line.expandtabs(4).rstrip(), font, widths, max_width):
+                placed.append((y, line))
+                y += line_spacing
+    # 最后一行只占字体本身的高度
+    height = (y - line_spacing + ascent + descent if placed else y) + margin
+    return placed, height
+
+
+def render_text(text: str, layout: str = 'help'):
+    """把文本排版成图片，返回灰度 PIL 图片对象"""
+    params = LAYOUTS[layout]
+    placed, height = layout_text(text, params)
+    img = PILImage.new('L', (params['image_width'], height), BACKGROUND_COLOR)
+    for y, line in placed:
+        if line:
+            img.paste(TEXT_COLOR, (params['margin'], y),
+                      _line_mask(line, params['font'], params['font_size']))
+    return img
+
+
+def _save(img, image_format: str, **options) -> bytes:
+    buffer = io.BytesIO()
+    img.save(buffer, format=image_format, **options)
+    return buffer.getvalue()
+
+
+def encode_image(img, params: dict):
+    """按字节预算编码，返回 (字节, 格式, 编码耗时秒)
+
+    依次尝试各候选编码，取第一个不超过预算的；都超出时取其中最小的。
+    """
+    start = time.perf_counter()
+    candidates = _ENCODINGS + (_LOSSY_ENCODINGS if params['lossy'] else ())
+    best = None
+    for image_format, _, encode in candidates:
+        data = encode(img)
+        if best is None or len(data) < len(best[0]):
+            best = (data, image_format)
+        if len(data) <= params['byte_budget']:
+            best = (data, image_format)
+            break
+    return best[0], best[1], time.perf_counter() - start
+
+
+def render_encoded(text: str, layout: str = 'help'):
+    """渲染并按预算编码，返回 (字节, 格式, 编码耗时秒)；在 cpu 进程池中执行，参数和返回值都可以序列化"""
+    return encode_image(render_text(text, layout), LAYOUTS[layout])
+
+
+def content_key(text: str, layout: str = 'help') -> str:
+    """文本和布局参数的内容哈希，作为缓存key和文件名"""
+    digest = hashlib.sha1(json.dumps(LAYOUTS[layout], sort_keys=True).encode('utf-8'))
+    digest.update(text.encode('utf-8'))
+    return digest.hexdigest()
+
+
+# 编码格式对应的文件扩展名，也用于从磁盘缓存中识别格式
+_EXTENSIONS = {'PNG': 'png', 'JPEG': 'jpg'}
+
+
+def _write_atomic(path: str, data: bytes):
+    """先写唯一命名的临时文件再原子替换，并发写同一文件时不会互相覆盖或读到写了一半的文件"""
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class RenderedImage:
+    """一张编码好的图片，保存在内存中：id 是内容哈希，data 是编码后的字节
+
+    同时记录编码格式和编码耗时，和 size 一起用来观察画质、体积和耗时的取舍。
+    发送时直接把字节以 base64 交给机器人客户端，不经过磁盘；
+    只有需要文件路径的接口才调用 spill() 写到内存文件系统。
+    """
+    __slots__ = ('id', 'data', 'format', 'encode_time', 'path', '_base64')
+
+    def __init__(self, image_id: str, data: bytes, image_format: str = 'PNG',
+                 encode_time: float = 0.0, path: str = None):
+        self.id = image_id
+        self.data = data
+        self.format = image_format
+        self.encode_time = encode_time
+        self.path = path
+        self._base64 = None
+
+    @property
+    def size(self) -> int:
+        return len(self.data)
+
+    @property
+    def extension(self) -> str:
+        return _EXTENSIONS[self.format]
+
+    @property
+    def base64_uri(self) -> str:
+        """base64:// 形式的图片，同一张图只编码一次"""
+        if self._base64 is None:
+            self._base64 = "base64://" + base64.b64encode(self.data).decode('ascii')
+        return self._base64
+
+    def spill(self) -> str:
+        """返回图片文件路径；没有落盘的图片写到内存文件系统，文件名就是内容哈希"""
+        if self.path is None:
+            os.makedirs(SPILL_DIR, exist_ok=True)
+            path = os.path.join(SPILL_DIR, f"{self.id}.{self.extension}")
+            _write_atomic(path, self.data)
+            self.path = path
+        return self.path
+
+
+class ImageCache:
+    """按内容哈希缓存渲染结果
+
+    内存中按LRU保留最近用到的图片，同样的文本只渲染一次。帮助图片这类固定内容
+    以 persist 保存到磁盘，进程重启后由 warm 直接读入，不再重新排版和编码；磁盘文件超过上限时删除最旧的。
+    排行榜等动态图片只保存在内存中，不写文件；get 只为本进程保存或读入过的持久图片访问磁盘，
+    动态图片在内存中未命中时不会在事件循环里逐个格式尝试打开文件。
+    """
+
+    def __init__(self, directory: str = CACHE_DIR, max_images: int = 32, max_files: int = 256):
+        self.directory = directory
+        self.max_images = max_images
+        self.max_files = max_files
+        self._images = OrderedDict()
+        # 持久图片的 key -> (磁盘文件路径, 格式)，被挤出内存后按路径直接读回
+        self._persisted = {}
+
+        # 统计
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str, extension: str) -> str:
+        return os.path.join(self.directory, f"{key}.{extension}")
+
+    def get(self, text: str, layout: str = 'help'):
+        """取缓存的图片，内存和磁盘都没有时返回None"""
+        key = content_key(text, layout)
+        image = self._images.get(key)
+        if image is None:
+            image = self._reload(key) if key in self._persisted else None
+            if image is None:
+                self.misses += 1
+                return None
+            self._remember(image)
+        else:
+            self._images.move_to_end(key)
+        self.hits += 1
+        return image
+
+    def _load(self, key: str):
+        """在磁盘缓存目录中按各格式查找图片，找到时登记为持久图片"""
+        for image_format, extension in _EXTENSIONS.items():
+            path = self._path(key, extension)
+            try:
+                with open(path, 'rb') as f:
+                    image = RenderedImage(key, f.read(), image_format, path=path)
+            except FileNotFoundError:
+                continue
+            self._persisted[key] = (path, image_format)
+            return image
+        return None
+
+    def _reload(self, key: str):
+        """按登记的路径读回持久图片，文件已被清理时取消登记"""
+        path, image_format = self._persisted[key]
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            del self._persisted[key]
+            return None
+        return RenderedImage(key, data, image_format, path=path)
+
+    def put(self, text: str, encoded: tuple, layout: str = 'help', persist: bool = False) -> RenderedImage:
+        """保存 render_encoded 的结果；persist 为 True 时同时写入磁盘缓存目录"""
+        data, image_format, encode_time = encoded
+        image = RenderedImage(content_key(text, layout), data, image_format, encode_time)
+        if persist:
+            os.makedirs(self.directory, exist_ok=True)
+            image.path = self._path(image.id, image.extension)
+            _write_atomic(image.path, data)
+            self._persisted[image.id] = (image.path, image.format)
+            self._prune_files()
+        return self._remember(image)
+
+    def warm(self, texts, layout: str = 'help') -> list:
+        """启动时准备好固定文本的图片：磁盘上已有的直接读入，没有的就地渲染，返回这些图片"""
+        images = []
+        for text in texts:
+            image = self.get(text, layout)
+            if image is None:
+                # 重启后第一次准备：先找上次保存的文件
+                image = self._load(content_key(text, layout))
+                image = self._remember(image) if image else self.put(
+                    text, render_encoded(text, layout), layout, persist=True)
+            images.append(image)
+        return images
+
+    def _remember(self, image: RenderedImage) -> RenderedImage:
+        self._images[image.id] = image
+        self._images.move_to_end(image.id)
+        while len(self._images) > self.max_images:
+            self._images.popitem(last=False)
+        return image
+
+    def _prune_files(self):
+        with os.scandir(self.directory) as entries:
+            files = [entry for entry in entries if not entry.name.endswith('.tmp')]
+        if len(files) <= self.max_files:
+            return
+        files.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in files[:len(files) - self.max_files]:
+            # 仍在内存中的图片保留文件，发送时还要用
+            key = entry.name.split('.')[0]
+            if key not in self._images:
+                self._persisted.pop(key, None)
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass